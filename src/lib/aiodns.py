@@ -123,7 +123,7 @@ def _dns_addr(x):
 
 
 # Asynchronous getaddrinfo compatible function
-async def getaddrinfo(host, port, family=AF_INET, type=0, proto=0, flags=0):
+async def getaddrinfo(host, port, family=AF_INET, type=0, proto=0, flags=0, timeout=None):
     host = host.lower()  # Domains are case-insensitive
     port = int(port)
     if not type:
@@ -150,7 +150,7 @@ async def getaddrinfo(host, port, family=AF_INET, type=0, proto=0, flags=0):
     s.setblocking(False)
     try:
         query_ids = []
-        tout = timeout_ms
+        tout = timeout_ms if timeout is None else timeout
         results = []
         finished = total = 0
         t = ticks_ms()
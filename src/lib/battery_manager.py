@@ -37,6 +37,9 @@ DIVIDER_RATIO = 2                   # voltage divider ratio:  (R2 + R41) / R41 =
 VBAT_READINGS = 20                  # number of readings for averaging
 
 # constants for the ADC calibration
+# Note: the readings use read_u16(), the 12 bits raw reading rescaled to 0-65535 by MicroPython (no per-chip
+# calibration applied, unlike read_uv()): the fraction of the full scale is the one of read(), within 1/65535,
+# therefore CORRECTION and SHIFT values tuned with the previous read() based code remain valid (no recalibration).
 CORRECTION = 1.0     #(default 1.0) # correction of adc reading slope vs measured (multimeter)
 SHIFT = 0.0          #(default 0.0) # correction of adc reading shift vs measured (multimeter)         
 
@@ -44,6 +47,9 @@ SHIFT = 0.0          #(default 0.0) # correction of adc reading shift vs measure
 VOLTAGE_LEVELS = (4.02, 3.95, 3.84, 3.725, 3.675, 3.64, 3.59)
 PERCENT_LEVELS = (100, 80, 60, 40, 20, 10, 0)
 
+# voltages half way in between two consecutive voltage thresholds (closest level boundaries)
+VOLTAGE_MIDPOINTS = tuple((VOLTAGE_LEVELS[i] + VOLTAGE_LEVELS[i + 1]) / 2 for i in range(len(VOLTAGE_LEVELS) - 1))
+
 # Constant to prevent battery level jumping up and down between levels
 HYSTERESIS_V = 0.03                 # 30 mV hysteresys for battery_level change (prevent jumping up and down)
 
@@ -60,9 +66,16 @@ class Battery():
         self.vbat_readings = VBAT_READINGS
         self.correction = CORRECTION
         self.shift = SHIFT
+        
+        # slope from the sum of the ADC readings (read_u16) to the battery voltage (averaging included),
+        # computed once from the settings above
+        self._adc_sum_to_v = self.correction * self.v_ref * self.divider_ratio / (65535 * (self.vbat_readings + 1))
+        
         self.hysteresys_v = HYSTERESIS_V
         self.voltage_levels = VOLTAGE_LEVELS
         self.percent_levels = PERCENT_LEVELS
+        self.voltage_midpoints = VOLTAGE_MIDPOINTS
+        self.lowest_index = len(VOLTAGE_LEVELS) - 1
         
         self.last_level = None
         self.batt_voltage_list = []
@@ -72,17 +85,16 @@ class Battery():
     def read_batt_voltage(self, adc_avg=0, bat_voltage=0):
         """Monitor the battery voltage"""
         try:
-            adc_avg = self.adc_bat.read()       # first ADC reading
+            read = self.adc_bat.read_u16        # local reference to the ADC read method
+            adc_sum = read()                    # first ADC reading
             sleep_ms(5)                         # short sleep time
 
             for _ in range(self.vbat_readings): # iterating vbat_readings times
-                adc_avg += self.adc_bat.read()  # adds raw ADC value (0-4095) for vbat_readings times
+                adc_sum += read()               # adds ADC value (0-65535) for vbat_readings times, as integer
                 sleep_ms(10)                    # short sleep time
             
-            adc_avg /= (self.vbat_readings + 1) # average the vbat_readings readings
-            
-            # convertion to batt voltage and correction
-            bat_voltage = self.shift + self.correction * (adc_avg / 4095) * self.v_ref * self.divider_ratio
+            # averaging, convertion to batt voltage and correction, in a single float operation
+            bat_voltage = self.shift + self._adc_sum_to_v * adc_sum
             return bat_voltage                  # returns the measured battery voltag
 
         except Exception as e:
@@ -108,8 +120,14 @@ class Battery():
         """
 
         
-        # 1) find closest nominal index
-        closest_index = min(range(len(self.voltage_levels)), key=lambda i: abs(voltage - self.voltage_levels[i]))
+        # 1) find closest nominal index (the voltage levels are descending, the first midpoint not above voltage)
+        closest_index = self.lowest_index
+        i = 0
+        for midpoint_v in self.voltage_midpoints:
+            if voltage >= midpoint_v:
+                closest_index = i
+                break
+            i += 1
         estimated_level = self.percent_levels[closest_index]
         
 
@@ -61,7 +61,18 @@ DISPLAY_REFRESH_MS    =     60_000   # 60 secs is the smaller acceptable period
 
 # NTP related settings
 NTP_SERVER_ATTEMPTS   =          5   # number of times each NTP server will be querried
+NTP_QUORUM            =          3   # number of acceptable NTP replies (from the parallel queries) ending the sync
+NTP_INTER_ATTEMPT_MS  =       2000   # guard time (in ms) between queries to the same NTP server
+NTP_SHORT_CIRCUIT_LATENCY_MS    =    50   # NTP reply latency (ms) good enough to end the sync
+NTP_SHORT_CIRCUIT_MAX_OFFSET_MS =   200   # max NTP offset (ms) for such a reply to end the sync
 MAX_NTP_OFFSET_MS     =       1000   # max time offset from NTP to reset internal RTC
+AIODNS_TIMEOUT_MS     =       5000   # timeout (in ms) for the asynchronous DNS resolution
+AIODNS_CHECK_TIMEOUT_MS =     1500   # shorter aiodns timeout (in ms) for the internet check, before the system DNS fallback
+NTP_IP_TTL_MS         =  1_800_000   # validity (in ms) of the resolved NTP servers IPs
+
+
+# Garbage collection
+GC_THRESHOLD          =      8_192   # free heap (in bytes) below which gc is forced before sleeping
 
 
 # Temperature shift
@@ -89,9 +100,6 @@ RESET_FILE_NAME    = "log/reset_reason.txt"
 # time delta in secs from 01/01/2000 (MicroPython system for ESP32)
 NTP_DELTA = 3155673600
 
-# fractional coefficient from Celsius to Fahrenheit conversion
-C_TO_F_COEFF = 9/5
-
 
 
 ###################################################################################################
@@ -210,6 +210,28 @@ class Display():
         
     
     
+    def compose_logo_text(self, text, x, y):
+        """ Compose the OSC logo with a text message, and return a copy of the framebuffer (for show_precomposed)."""
+        
+        self.plot_osc(text=False, plot=False, show_ms=0)   # add the logo to the framebuffer
+        self.text(text, x, y)                              # add the text to the framebuffer
+        return bytes(self.epd.buffer)                      # copy of the composed framebuffer
+        
+    
+    
+    def show_precomposed(self, fb, show_time_ms=5000):
+        """ Plot a framebuffer composed by compose_logo_text, without rasterizing it again."""
+        
+        if self.sleeping:
+            self.epd_wakeup()
+        
+        self.epd.buffer[:] = fb                            # copy the composed framebuffer
+        self.epd.partialDisplay()                          # partial update of the display
+        self.show_time(show_time_ms)                       # sleep time to read the message
+        self.bg = True                                     # activates the background plot request
+        
+    
+    
     def text(self, text, x, y):
         """ Add a text message to the framebuffer."""
         
@@ -355,7 +377,7 @@ class Display():
         if ds3231_temp != self.last_ds3231_temp:
             self.epd.fill_rect(self.ds3231_temp_x, self.ds3231_temp_y, 210, 33, 1)  # add a white rect to erase old text
             Writer.set_textpos(self.epd, self.ds3231_temp_y, self.ds3231_temp_x)
-            self.wri_32.printstring(f"{round(ds3231_temp,1)} °{self.degrees}", invert=True)
+            self.wri_32.printstring("%.1f °%s" % (ds3231_temp, self.degrees), invert=True)
             self.last_ds3231_temp = ds3231_temp
             update_epd = True
         
@@ -363,14 +385,14 @@ class Display():
             if self.hour12 and H1 == '0':
                 if self.last_H1 == '1' or self.last_H1 == -1:
                     self.epd.fill_rect(self.m1_x, self.m1_y, 82, 110, 1)  # add a white rect to erase old text
-                t_string = f"{H2}"
+                t_string = H2
                 Writer.set_textpos(self.epd, self.m1_y, self.m1_x+82)
             else:
-                t_string = f"{H1+H2}"
+                t_string = H1 + H2
                 Writer.set_textpos(self.epd, self.m1_y, self.m1_x)
             self.wri_110.printstring(t_string, invert=True)
             
-            t_string = f"{M1+M2}"
+            t_string = M1 + M2
             Writer.set_textpos(self.epd, self.s1_y, self.s1_x)
             self.wri_110.printstring(t_string, invert=True)
 
@@ -381,10 +403,10 @@ class Display():
             update_epd = True
         
         elif H2 != self.last_H2:
-            t_string = f"{H2}"
+            t_string = H2
             Writer.set_textpos(self.epd, self.m2_y, self.m2_x)
             self.wri_110.printstring(t_string, invert=True)
-            t_string = f"{M1+M2}"
+            t_string = M1 + M2
             Writer.set_textpos(self.epd, self.s1_y, self.s1_x)
             self.wri_110.printstring(t_string, invert=True)
             self.last_H2 = H2
@@ -393,7 +415,7 @@ class Display():
             update_epd = True
             
         elif M1 != self.last_M1:
-            t_string = f"{M1+M2}"
+            t_string = M1 + M2
             Writer.set_textpos(self.epd, self.s1_y, self.s1_x)
             self.wri_110.printstring(t_string, invert=True)
             self.last_M1 = M1
@@ -84,6 +84,10 @@ def bcdtodec(bcd):
     return tens * 10 + ones         # compute decimal value
 
 
+# BCD byte to decimal lookup table (all the 256 byte values), used when decoding the time registers
+_BCD2DEC = bytes(((b >> 4) & 0x0F) * 10 + (b & 0x0F) for b in range(256))
+
+
 # ------------------------------------------------------------------------------
 # Main DS3231 driver class
 # ------------------------------------------------------------------------------
@@ -130,6 +134,7 @@ class DS3231:
         self._buf      = bytearray(1)  # single-byte buffer for control/status ops
         self._al1_buf  = bytearray(4)  # buffer for the first 4 bytes of Alarm 1
         self._al2buf   = bytearray(3)  # buffer for all bytes of Alarm 2
+        self._allbuf   = bytearray(19) # buffer for all registers, from time (0x00) to temperature (0x12)
         
     
     
@@ -169,9 +174,14 @@ class DS3231:
         temp_bytes = self.i2c.readfrom_mem(
             self.addr, TEMPERATURE_REG, 2
         )
+        return self._decode_temperature(temp_bytes[0], temp_bytes[1])
 
+    
+    
+    def _decode_temperature(self, msb, lsb):
+        """Convert the temperature registers (MSB, LSB) to Celsius."""
         # combine bytes into a single signed 16-bit integer
-        raw_temp = (temp_bytes[0] << 8) | temp_bytes[1]
+        raw_temp = (msb << 8) | lsb
         # If negative, convert from two's complement
         if raw_temp & 0x8000:
             raw_temp -= 0x10000
@@ -208,34 +218,11 @@ class DS3231:
             # [5] = month (BCD + century flag in bit 7)
             # [6] = year (BCD, 00-99 → 2000-2099)
 
-            # Convert each BCD field to decimal:
-            seconds = bcdtodec(self._timebuf[0])
-            minutes = bcdtodec(self._timebuf[1])
-
-            # Hour decoding: test bit 6 → 12/24h mode
-            hr_reg = self._timebuf[2]
-            if (hr_reg & 0x40):  # if bit 6 set → 12-h mode
-                # mask out format bits to get BCD hour, then add 12 if PM bit (5) set
-                hour = bcdtodec(hr_reg & 0x1F)
-                if (hr_reg & 0x20):  # PM indicator
-                    hour += 12
-            else:
-                # 24-h mode: mask out only bit 6, decode BCD
-                hour = bcdtodec(hr_reg & 0x3F)
-                
-            weekday = bcdtodec(self._timebuf[3])
-            day     = bcdtodec(self._timebuf[4])
-            month   = bcdtodec(self._timebuf[5] & 0x7F)   # mask out century bit
-            year    = bcdtodec(self._timebuf[6]) + 2000   # base 2000
-            
-            weekday = (weekday -1 ) % 7  # from DS3121 1-7 to MicroPython 0-6
-
             # Warn if oscillator was stopped (power loss)
             if self.OSF():
                 print("WARNING: Oscillator stop flag set. Time may not be accurate.")
 
-            # Return full tuple plus dummy yearday (0) to match ESP32 RTC MicroPython API
-            return (year, month, day, hour, minutes, seconds, weekday, 0)
+            return self._decode_datetime(self._timebuf)
 
         # A new datetime tuple was provided by the user to set the RTC.
         # Let's perform some basic validation:
@@ -297,6 +284,52 @@ class DS3231:
 
     
     
+    def _decode_datetime(self, buf):
+        """Decode the 7 time registers (BCD) in buf to a MicroPython time tuple."""
+        # Convert each BCD field to decimal (table lookup):
+        bcd = _BCD2DEC
+        seconds = bcd[buf[0]]
+        minutes = bcd[buf[1]]
+
+        # Hour decoding: test bit 6 → 12/24h mode
+        hr_reg = buf[2]
+        if (hr_reg & 0x40):  # if bit 6 set → 12-h mode
+            # mask out format bits to get BCD hour, then add 12 if PM bit (5) set
+            hour = bcd[hr_reg & 0x1F]
+            if (hr_reg & 0x20):  # PM indicator
+                hour += 12
+        else:
+            # 24-h mode: mask out only bit 6, decode BCD
+            hour = bcd[hr_reg & 0x3F]
+            
+        weekday = bcd[buf[3]]
+        day     = bcd[buf[4]]
+        month   = bcd[buf[5] & 0x7F]   # mask out century bit
+        year    = bcd[buf[6]] + 2000   # base 2000
+        
+        weekday = (weekday -1 ) % 7  # from DS3121 1-7 to MicroPython 0-6
+
+        # Return full tuple plus dummy yearday (0) to match ESP32 RTC MicroPython API
+        return (year, month, day, hour, minutes, seconds, weekday, 0)
+
+    
+    
+    def read_all(self):
+        """Read all the registers, from time (0x00) to temperature (0x12), in one I²C transaction.
+        
+        :return: (datetime tuple, temperature in °C)
+        """
+        buf = self._allbuf
+        self.i2c.readfrom_mem_into(self.addr, DATETIME_REG, buf)
+        
+        # Warn if oscillator was stopped (power loss), from the status register in the same read
+        if buf[STATUS_REG] & 0x80:
+            print("WARNING: Oscillator stop flag set. Time may not be accurate.")
+        
+        return self._decode_datetime(buf), self._decode_temperature(buf[TEMPERATURE_REG], buf[TEMPERATURE_REG + 1])
+
+    
+    
     def square_wave(self, freq=None):
         """Enable/read square-wave output on SQW pin.
         
@@ -351,6 +384,26 @@ class DS3231:
 
     
     
+    def convert_temperature(self):
+        """Force a temperature conversion, applying also the aging offset to the TCXO (CONTROL_REG bit 5).
+        
+        Returns False, without forcing, when a conversion is already in progress.
+        """
+        if self._is_busy():
+            return False
+        self.i2c.readfrom_mem_into(self.addr, CONTROL_REG, self._buf)
+        self.i2c.writeto_mem(self.addr, CONTROL_REG, bytearray([self._buf[0] | (1 << 5)]))
+        return True
+
+    
+    
+    def conversion_done(self):
+        """Return True when no conversion is pending (CONV bit and BSY bit both cleared)."""
+        conv = self.i2c.readfrom_mem(self.addr, CONTROL_REG, 1)[0] & (1 << 5)
+        return not conv and not self._is_busy()
+
+    
+    
     def _is_busy(self):
         """Return True if the DS3231 is busy with TCXO frequency trimming (STATUS_REG bit 2)."""
         return bool(self.i2c.readfrom_mem(self.addr, STATUS_REG, 1)[0] & (1 << 2))
\ No newline at end of file
@@ -28,17 +28,36 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from utime import time_ns, ticks_ms, ticks_diff, gmtime, sleep_ms
+from utime import time, time_ns, ticks_ms, ticks_diff, gmtime, sleep_ms
 from socket import socket, getaddrinfo, AF_INET, SOCK_DGRAM
-from struct import pack_into, unpack
+from struct import pack_into, unpack_from
 from network import WLAN, STA_IF
 from machine import RTC
+from urandom import getrandbits
 
 import uasyncio as asyncio
-import json, gc, aiodns
+import json, gc, heapq, aiodns
 
 from lib.config import config
 
+# ssid values meaning the secrets.json file was not edited by the user
+_PLACEHOLDERS = frozenset(('', 'YOUR_SSID', 'YOUR_SSID_HERE'))
+
+# NTP packet layout and fixed-point rounding
+_NTP_QUERY_TEMPLATE = bytes([0x1B] + [0] * 47)  # LI=0, VN=3, Mode=3 (client)
+_NTP_TS_FMT = "!II"                             # NTP timestamp: seconds, fraction of second
+_NTP_FRAC_HALF = 2147483648                     # 1 << 31, half of the NTP fraction of second scale
+
+
+
+
+def _jitter(base_ms, frac=0.2):
+    """Return base_ms randomly spread by +/- frac, to avoid hitting the servers at regular intervals."""
+    return base_ms + int((getrandbits(16) / 32768 - 1) * frac * base_ms)
+
+
+
+
 class NetworkManager:
     def __init__(self, wdt_manager, try_open_networks):
         
@@ -50,6 +69,9 @@ class NetworkManager:
         self.num_ntp_servers = len(config.NTP_SERVERS)
         self.ntp_delta = config.NTP_DELTA
         
+        # default timeout (in ms) for the asynchronous DNS resolution
+        aiodns.timeout_ms = config.AIODNS_TIMEOUT_MS
+        
         # defining the minimum amount of NTP server to interate when non-blocking NTP sync
         self.min_num_servers = round(0.6 * self.num_ntp_servers) if self.num_ntp_servers > 1 else 1
         
@@ -66,17 +88,57 @@ class NetworkManager:
         
         # intantiate the mcu RTC, for meaningfull offset info when NTP sync
         self.rtc = RTC()
+        
+        # number of (strongest) open networks kept from the scan, and later tried
+        self._top_open_aps_limit = 3
+        
+        # time reference of the latest wdt feed from the busy-poll loops
+        self._last_feed_ms = 0
+        
+        # UDP sockets for the NTP queries (one per server), kept alive across syncs (closed when wlan gets disabled)
+        self._ntp_socks = {}
+        
+        # counter of the internal RTC resets, to discard the NTP samples taken across a reset
+        self._rtc_resets = 0
+        
+        # count of the acceptable NTP replies and the best one, within a sync
+        self._reset_ntp_best()
+        
+        # time reference (RTC secs, ticks_ms wraps within days) and validity (TTL) of the NTP servers resolution
+        self._ntp_ip_ts = None
+        self._ntp_ip_ttl_ms = config.NTP_IP_TTL_MS
+        
+        # NTP servers IPs dict to refresh (in place) once the next NTP queries are over, None if no refresh is due
+        self._ntp_ip_refresh_pending = None
     
     
     
     
-    def feed_wdt(self, label=""):
+    def feed_wdt(self, label):
         """use the WDT manager instead of global WDT"""
         self.wdt_manager.feed(label)
     
     
     
     
+    def _log(self, fmt, *args):
+        """print to the terminal when DEBUG, the string is only formatted in that case"""
+        if config.DEBUG:
+            print(fmt.format(*args))
+    
+    
+    
+    
+    def _maybe_feed(self, label, period_ms=500):
+        """feed the wdt from busy-poll loops, at most once every period_ms"""
+        now = ticks_ms()
+        if ticks_diff(now, self._last_feed_ms) >= period_ms:
+            self.feed_wdt(label)
+            self._last_feed_ms = now
+    
+    
+    
+    
     def load_wifi_config(self, filename="lib/config/secrets.json"):
         """
         Loads the ssid and passwords from the json filename.
@@ -85,7 +147,7 @@ class NetworkManager:
         """
         
         # feed the wdt
-        self.feed_wdt(label="load_wifi_config")
+        self.feed_wdt("load_wifi_config")
         
         try:
             with open(filename, 'r') as f:
@@ -98,7 +160,7 @@ class NetworkManager:
             if config.DEBUG:
                 if self.try_open_networks:
                     print(f"\n[INFO]     Not found file {filename}, will search for open networks\n")
-                elif not self.try_open_networks:
+                else:
                     print(f"[ERROR]    error loading config: {e}")
             
             return []
@@ -119,7 +181,7 @@ class NetworkManager:
         """
         
         # feed the wdt
-        self.feed_wdt(label="evaluate_networks")
+        self.feed_wdt("evaluate_networks")
         
         try:
             secrets = True
@@ -135,13 +197,13 @@ class NetworkManager:
                     only_open_networks = True
                 
                 # case the networks list (list of dicts) is not empty
-                elif networks:
+                else:
                     try:
                         # analyse the first ssid/password of the list
                         netw = networks[0]
                         
                         # case the ssid/password fields are empty or not edited
-                        if netw['ssid'] == '' or 'YOUR_SSID' in netw['ssid'] or netw['password'] == '':
+                        if netw['ssid'] in _PLACEHOLDERS or netw['password'] == '':
                             
                             # assuming open netwroks is the user intent (only_open_networks=True)
                             only_open_networks = True
@@ -188,7 +250,7 @@ class NetworkManager:
         """       
         
         # feed the wdt
-        self.feed_wdt(label="get_network_info")
+        self.feed_wdt("get_network_info")
         
         if not networks:
             # feedback is printed to the terminal
@@ -211,10 +273,10 @@ class NetworkManager:
     
     
     def scan_open_networks(self):
-        """scan for open WiFi networks and return them sorted by signal strength"""
+        """scan for open WiFi networks and return the 3 strongest ones, sorted by signal strength"""
         
         # feed the wdt
-        self.feed_wdt(label="scan_open_networks")
+        self.feed_wdt("scan_open_networks")
         
         if config.DEBUG:
             print("[WiFi]     scanning for Wi-Fi networks...")
@@ -232,25 +294,41 @@ class NetworkManager:
         sleep_ms(20)
         self.wlan.active(True)
 
-        aps = self.wlan.scan()  # list of tuples: (ssid, bssid, channel, RSSI, authmode, hidden)
-        open_aps = []
-        for ap in aps:
-            ssid_bytes = ap[0]
-            ssid = ssid_bytes.decode() if isinstance(ssid_bytes, bytes) else str(ssid_bytes)
-            authmode = ap[4]
-            # in MicroPython: authmode==0 means open (no encryption)
-            if authmode == 0:
-                open_aps.append({'ssid': ssid, 'rssi': ap[3], 'channel': ap[2]})
+        # scan returns a list of tuples: (ssid, bssid, channel, RSSI, authmode, hidden)
+        # in MicroPython: authmode==0 means open (no encryption)
+        # a min-heap of (rssi, ssid, channel) keeps only the strongest open networks
+        top = []
+        num_open_aps = 0
+        for ap in self.wlan.scan():
+            if ap[4] == 0:
+                num_open_aps += 1
+                heapq.heappush(top, (ap[3], ap[0], ap[2]))
+                if len(top) > self._top_open_aps_limit:
+                    heapq.heappop(top)
         
         # sort by signal strength (strongest first)
-        open_aps.sort(key=lambda x: x['rssi'], reverse=True)
+        top.sort(reverse=True)
+        
+        # only the strongest open networks are later tried, therefore only those are decoded
+        top_aps = [{'ssid': self._decode_ssid(ssid), 'rssi': rssi, 'channel': channel}
+                   for rssi, ssid, channel in top]
         
         if config.DEBUG:
-            print("[WiFi]     found {} open network(s).".format(len(open_aps)))
-            for i, a in enumerate(open_aps):
+            print("[WiFi]     found {} open network(s).".format(num_open_aps))
+            for i, a in enumerate(top_aps):
                 print("[WiFi]    {:2d}. SSID: {!r}, RSSI: {}, channel: {}".format(i+1, a['ssid'], a['rssi'], a['channel']))
         
-        return open_aps
+        return top_aps
+    
+    
+    
+    
+    def _decode_ssid(self, ssid):
+        """decode the scanned ssid to string"""
+        
+        if not isinstance(ssid, bytes):
+            return str(ssid)
+        return ssid.decode()
     
     
     
@@ -259,10 +337,10 @@ class NetworkManager:
         """check internet connectivity using the DNS resolution functionality"""
         
         for attempt in range(attempts):
-            self.feed_wdt(label="is_internet_available")
+            self.feed_wdt("is_internet_available")
             
             try:
-                ntp_servers_ip = await self.get_ntp_servers_ip(internet_check=True)
+                ntp_servers_ip = await self.get_ntp_servers_ip(internet_check=True, timeout_ms=config.AIODNS_CHECK_TIMEOUT_MS)
                 
                 if ntp_servers_ip and len(ntp_servers_ip) > 0:
                     print(f"[INTERNET] internet connectivity detected: {len(ntp_servers_ip)} NTP servers were DNS resolved")
@@ -281,11 +359,11 @@ class NetworkManager:
     
     
     
-    def connect_to_open_wifi(self, ssid, max_attempts=3):
-        """Attempt to connect to an open WiFi network"""
+    async def connect_to_open_wifi(self, ssid, max_attempts=3):
+        """Attempt to connect to an open WiFi network (the event loop is not blocked while waiting)"""
         
         # feed the wdt
-        self.feed_wdt(label="connect_to_open_wifi")
+        self.feed_wdt("connect_to_open_wifi")
         
         # caase the wlan object is None
         if self.wlan is None:
@@ -293,8 +371,7 @@ class NetworkManager:
             self.wlan = WLAN(STA_IF)
         
         # feedback is printed to the terminal
-        if config.DEBUG:
-            print(f"[WIFI]     trying to connect to open network: {ssid} ...")
+        self._log("[WIFI]     trying to connect to open network: {} ...", ssid)
         
         # iterate over the attempts
         for attempt in range(max_attempts):
@@ -314,10 +391,10 @@ class NetworkManager:
             timeout = 0
             
             # iterate until wlan connects or timeut (10 secs)
-            while not self.wlan.isconnected() and timeout < 500:
-                # feed the wdt
-                self.feed_wdt(label="connect_to_open_wifi_wait")
-                sleep_ms(20)
+            while not self.wlan.isconnected() and timeout < 200:
+                # feed the wdt (throttled)
+                self._maybe_feed("connect_to_open_wifi_wait")
+                await asyncio.sleep_ms(50)
                 timeout += 1
             
             # case of successfull connection
@@ -340,8 +417,7 @@ class NetworkManager:
                 return True
             
             # feedback is printed to the terminal
-            if config.DEBUG:
-                print(f"[WIFI]     failed to connect to {ssid}, attempt {attempt + 1}")
+            self._log("[WIFI]     failed to connect to {}, attempt {}", ssid, attempt + 1)
             
             # case of a 1st failure, increases the wlan tx power to max
             if attempt == 1:
@@ -355,10 +431,21 @@ class NetworkManager:
     
     
     def connect_to_wifi(self, blocking=True):
+        """
+        Synchronous wrapper of connect_to_wifi_async, for callers without a running event loop.
+        Returns a WLAN object on success.
+        """
+        return asyncio.run(self.connect_to_wifi_async(blocking=blocking))
+    
+    
+    
+    
+    async def connect_to_wifi_async(self, blocking=True):
         """
         Attempt to connect to one of the SSIDs in ssid_list.
         Tries each SSID/password pair multiple times, with watchdog feeds.
         If open_networks is set True, those are scannes and tried too.
+        While waiting for the connection the event loop is not blocked.
         Returns a WLAN object on success.
         """
         
@@ -374,6 +461,9 @@ class NetworkManager:
         # set the number of connections attempts
         attempts = 1 if not blocking else 5
         
+        # full radio reset only before the first AP, a lighter disconnect in between APs
+        first_ap = True
+        
         # iterate over the attempts
         for attempt in range(attempts):   # outer retry loop
             
@@ -388,19 +478,22 @@ class NetworkManager:
                         t_ref_ms = ticks_ms()
                     
                     # feed the wdt
-                    self.feed_wdt(label="connect_to_wifi_1")
+                    self.feed_wdt("connect_to_wifi_1")
                     
                     # retrieve the password for this ssid
                     password = self.passw_list[priority]
                     
                     # feedback is printed to the terminal
-                    if config.DEBUG:
-                        print(f"\n[WIFI]     trying to connect to: {ssid} ...")
+                    self._log("\n[WIFI]     trying to connect to: {} ...", ssid)
 
                     # ensure we start fresh for each AP
-                    self.disable_wifi(printout=False)
-                    sleep_ms(20)
-                    self.wlan.active(True)
+                    if first_ap or not self.wlan.active():
+                        self.disable_wifi(printout=False)
+                        sleep_ms(20)
+                        self.wlan.active(True)
+                        first_ap = False
+                    else:
+                        self._reset_for_next_ap()
                     
                     # attempt to connect to this ssid
                     self.wlan.connect(ssid, password)
@@ -409,11 +502,11 @@ class NetworkManager:
                     timeout = 0
                     
                     # iterate until wlan connects or timeut (10 secs)
-                    while not self.wlan.isconnected() and timeout < 500:
+                    while not self.wlan.isconnected() and timeout < 200:
                         
-                        # feed the wdt
-                        self.feed_wdt(label="connect_to_wifi_2")
-                        sleep_ms(20)
+                        # feed the wdt (throttled)
+                        self._maybe_feed("connect_to_wifi_2")
+                        await asyncio.sleep_ms(50)
                         timeout += 1
                     
                     # case of successfull connection
@@ -438,8 +531,7 @@ class NetworkManager:
                     # case of failed connection
                     else:
                         # feedback is printed to the terminal
-                        if config.DEBUG:
-                            print(f"[WIFI]     failed to connect to {ssid}, attempt {attempt}")
+                        self._log("[WIFI]     failed to connect to {}, attempt {}", ssid, attempt)
 
                 # end for ssid_list
             
@@ -456,10 +548,10 @@ class NetworkManager:
                 open_networks = self.scan_open_networks()
                 
                 # case open networks are found, iterates over those with stronger signal
-                for open_net in open_networks[:3]:  # try top 3 strongest open networks
+                for open_net in open_networks:  # already limited to the strongest open networks
                     
                     # attempt to connect to this open network ssid
-                    if self.connect_to_open_wifi(open_net['ssid']):
+                    if await self.connect_to_open_wifi(open_net['ssid']):
                         
                         # set the wifi_bool to True (success) 
                         self.wifi_bool = True
@@ -478,7 +570,7 @@ class NetworkManager:
             # case the function has been called as blocking
             else:
                 # feed the wdt
-                self.feed_wdt(label="connect_to_wifi_3")
+                self.feed_wdt("connect_to_wifi_3")
                 
                 # case of a 1st failure, increases the wlan tx power to max
                 if attempt == 1:
@@ -515,7 +607,7 @@ class NetworkManager:
         if self.wlan is None or not self.wlan.active() or not self.wlan.isconnected():
             
             # call the fuction to establish a wlan connection
-            self.wlan = self.connect_to_wifi(blocking=blocking)
+            self.wlan = await self.connect_to_wifi_async(blocking=blocking)
             
             # case the wlan object exists and is not active
             if self.wlan is not None and not self.wlan.active:
@@ -537,7 +629,7 @@ class NetworkManager:
                     print("[ERROR]   WiFi connection lost, attempting to reconnect ...")
                 
                 # call the function for wal connection
-                self.wlan = self.connect_to_wifi(blocking=blocking)
+                self.wlan = await self.connect_to_wifi_async(blocking=blocking)
         
         # return the wlan object
         return self.wlan
@@ -551,7 +643,10 @@ class NetworkManager:
         # case the wlan object is not None
         if self.wlan is not None:
             
-            # iterates even times check, change, check ...
+            # last applied tx power, to stop iterating once the setting is stable
+            last_txpower = None
+            
+            # iterates check, change, check ... until the tx power is unchanged (max 4 times)
             for i in range(4):
                 
                 # check the rssi (signal strenght)
@@ -567,11 +662,16 @@ class NetworkManager:
                 else:
                     txpower = 20    # ~20 dBm  (max)
                 
+                # case the tx power is unchanged from the previous iteration (already applied)
+                if txpower == last_txpower:
+                    break
+                
                 # set the flag printout False
                 printout=False
                 
                 # set the wlan transmission power accordingly
                 txpower = self._set_wlan_power(txpower=txpower, printout=printout)
+                last_txpower = txpower
                 
                 # small delay
                 sleep_ms(20)
@@ -624,8 +724,8 @@ class NetworkManager:
             # while loop until wlan is connected
             while self.wlan.isconnected():
                 
-                # feed the wdt
-                self.feed_wdt(label="disable_wifi_1")
+                # feed the wdt (throttled)
+                self._maybe_feed("disable_wifi_1")
                 
                 # sleep the fict amount of time
                 sleep_ms(sleep_for_ms)
@@ -641,9 +741,26 @@ class NetworkManager:
     
     
     
+    def _reset_for_next_ap(self):
+        """Prepare the wlan to connect to the next AP, without deactivating the radio."""
+        
+        # case the wlan is connected, it gets disconnected (waiting for it)
+        if self.wlan.isconnected():
+            self._disconnect_wlan()
+        
+        # case the wlan is not connected, a pending connection attempt gets aborted
+        else:
+            self.wlan.disconnect()
+    
+    
+    
+    
     def _deactivate_wlan(self):
         """Deactivate the wlan."""
         
+        # fix sleep time (in ms) while checking for the radio to deactivate
+        sleep_for_ms = 10
+        
         # reset the counter, later used to escape the while-loop in case it gets stuck
         times = 0
         
@@ -656,8 +773,8 @@ class NetworkManager:
             # while loop until wlan is active
             while self.wlan.active():
                 
-                # feed the wdt
-                self.feed_wdt(label="disable_wifi_2")
+                # feed the wdt (throttled)
+                self._maybe_feed("disable_wifi_2")
                 
                 # sleep the fict amount of time
                 sleep_ms(sleep_for_ms)
@@ -673,12 +790,46 @@ class NetworkManager:
     
     
     
+    def _get_ntp_socket(self, server):
+        """Return the non-blocking UDP socket for the NTP queries to server, created at first use and then reused."""
+        
+        s = self._ntp_socks.get(server)
+        
+        # case the socket does not exist yet (first use or closed at wlan disabling)
+        if s is None:
+            s = socket(AF_INET, SOCK_DGRAM)
+            s.setblocking(False)
+            self._ntp_socks[server] = s
+        
+        return s
+    
+    
+    
+    
+    def _close_ntp_socket(self, server=None):
+        """Close the UDP socket for the NTP queries to server, or all of them when server is None."""
+        
+        servers = list(self._ntp_socks) if server is None else (server,)
+        for server in servers:
+            s = self._ntp_socks.pop(server, None)
+            if s is not None:
+                try:
+                    s.close()
+                except Exception:
+                    pass
+    
+    
+    
+    
     def disable_wifi(self, printout=True):
         """Function to disable the wlan module, to save energy and to enable lightsleep"""
         
         # time reference
         t_start_ms = ticks_ms()
         
+        # the NTP sockets are bound to the current wlan session, therefore released
+        self._close_ntp_socket()
+        
         # disconnect the wlan from the modem/router
         ret = self._disconnect_wlan()
         
@@ -694,8 +845,75 @@ class NetworkManager:
     
     
     
-    async def get_ntp_servers_ip(self, repeats=1, blocking=True, internet_check=False):
-        """Resolve NTP servers asynchronously using aiodns."""
+    def _system_resolve(self, server):
+        """
+        Resolve the server via the system (lwIP) resolver, used as fallback of aiodns.
+        Note: this call is blocking, the DNS servers are the ones provided by the router.
+        """
+        
+        # feed the wdt, before and after the blocking call
+        self.feed_wdt("system DNS resolution")
+        
+        try:
+            return getaddrinfo(server, 123, 0, SOCK_DGRAM)
+        except Exception as e:
+            # feedback is printed to the terminal
+            if config.DEBUG:
+                print(f"[ERROR]    {server} on system DNS resolution: {e}")
+            return None
+        finally:
+            self.feed_wdt("system DNS resolution done")
+    
+    
+    
+    
+    async def _resolve_one(self, server, ntp_servers_ip, timeout_ms=None):
+        """
+        Resolve a NTP server asynchronously using aiodns.
+        The server IP is stored into the ntp_servers_ip dict (key is the server).
+        """
+        
+        if config.DEBUG:
+            t_ref_ms = ticks_ms()
+        
+        try:
+            # calls the asynchronous DNS resolver function
+            addr_info = await aiodns.getaddrinfo(server, 123, timeout=timeout_ms)  # non-blocking, timeout in ms
+            
+            # case of DNS result
+            if addr_info:
+                # IP of the server is gathered from the addr_info list and stored in the dict (key is the server)
+                ntp_servers_ip[server] = addr_info[0][-1]
+                
+                if config.DEBUG:
+                    print(f"[DEBUG]    server {server} IP: {addr_info[0]}, resolved in {ticks_diff(ticks_ms(), t_ref_ms)} ms")
+        
+        except asyncio.CancelledError:
+            raise
+        
+        except asyncio.TimeoutError:
+            # feedback is printed to the terminal
+            if config.DEBUG:
+                print(f"[TIMEOUT]    {server} on DNS resolution")
+        
+        except Exception as e:
+            # feedback is printed to the terminal
+            if config.DEBUG:
+                print(f"[ERROR]    {server} on DNS resolution: {e}")
+        
+        # feed the wdt, once per completed resolution
+        self.feed_wdt("DNS resolution completed")
+    
+    
+    
+    
+    async def get_ntp_servers_ip(self, repeats=1, blocking=True, internet_check=False, timeout_ms=None):
+        """
+        Resolve NTP servers asynchronously using aiodns, the servers are resolved in parallel.
+        The resolution stops as soon as enough servers are resolved (one for internet_check,
+        min_num_servers when non-blocking, all the servers when blocking).
+        The argument timeout_ms overrides the default DNS timeout (aiodns.timeout_ms) for this call.
+        """
         
         # force garbage collection
         gc.collect()
@@ -706,63 +924,56 @@ class NetworkManager:
             else:
                 print("\n[DEBUG]    DNS resolution for NTP servers")
             
-        aiodns.timeout_ms = 5000      # timeout for the asyncio task (in ms)
         sleep_for_ms = 500            # sleeping time in between sequential attempts
         ntp_servers_ip = {}           # empty dictionary to store NTP servers and their IP
         
+        # number of resolved servers sufficient to stop the resolution
+        if internet_check:
+            target = 1                         # one resolved server proves internet accessibility
+        elif not blocking:
+            target = self.min_num_servers      # typical case
+        else:
+            target = self.num_ntp_servers      # all the servers
+        
         # iterate for the repeats passed ar argument
         for repeat in range(repeats):
             
             # feed the wdt
-            self.feed_wdt(label="repeat DNS resolution")
+            self.feed_wdt("repeat DNS resolution")
             
-            # iterate over the NTP servers defined in the config.py
-            for server in config.NTP_SERVERS:
-                
-                # force garbage collection
-                gc.collect()
-                
-                if config.DEBUG:
-                    t_ref_ms = ticks_ms()
-
-                try:
-                    # feed the wdt
-                    self.feed_wdt(label="try DNS resolution")
-                    
-                    # calls the asynchronous DNS resolver function
-                    addr_info = await aiodns.getaddrinfo(server, 123)  # non-blocking dns_timeout_s)  # timeout in seconds
-                    
-                    # case of DNS result
-                    if addr_info:
-                        
-                        # IP of the server is gathered from the addr_info list and stored in the dict (key is the server)
-                        ntp_servers_ip[server] = addr_info[0][-1]
-                        
-                        # case the passed argument internet_check is True
-                        if internet_check:
-                            # the first IP is returned (proving internet accessibility)
-                            return ntp_servers_ip
-                        
-                        if config.DEBUG:
-                            print(f"[DEBUG]    server {server} IP: {addr_info[0]}, resolved in {ticks_diff(ticks_ms(), t_ref_ms)} ms")
-                
-                except asyncio.TimeoutError:
-                    # feedback is printed to the terminal
-                    if config.DEBUG:
-                        print(f"[TIMEOUT]    {server} on DNS resolution")
-                
-                except Exception as e:
-                    # feedback is printed to the terminal
-                    if config.DEBUG:
-                        print(f"[ERROR]    {server} on DNS resolution: {e}")
-                
-                # case the function is called as non-blocking and at least one NTP server IP is resolved
-                if not blocking and len(ntp_servers_ip) > 0:
-                    # iteration over NTP servers is stopped
-                    break
+            # one task per NTP server (not yet resolved), the DNS queries run in parallel
+            tasks = [asyncio.create_task(self._resolve_one(server, ntp_servers_ip, timeout_ms))
+                     for server in config.NTP_SERVERS if server not in ntp_servers_ip]
+            
+            try:
+                # wait until enough servers are resolved, or all the tasks are completed
+                while len(ntp_servers_ip) < target and not all(task.done() for task in tasks):
+                    await asyncio.sleep_ms(20)
+            
+            finally:
+                # the still pending tasks are cancelled (their sockets get closed)
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+            
+            # case of internet check and aiodns failure, the system resolver is tried as fallback: being blocking,
+            # a single server is tried (the aiodns timeout of the internet check is shorter, AIODNS_CHECK_TIMEOUT_MS)
+            if internet_check and not ntp_servers_ip:
+                server = config.NTP_SERVERS[0]
+                addr_info = self._system_resolve(server)
+                if addr_info:
+                    ntp_servers_ip[server] = addr_info[0][-1]
+            
+            # case the passed argument internet_check is True and one IP is resolved
+            if internet_check and ntp_servers_ip:
+                # the first IP is returned (proving internet accessibility)
+                return ntp_servers_ip
             
             # case all IP has bee resolved for all the NTP servers
             if len(ntp_servers_ip) == self.num_ntp_servers:
+                # time reference of the resolution, for the TTL
+                self._ntp_ip_ts = time()
+                
                 # the dictionary of the servers and IPs is returned
                 return ntp_servers_ip
             
@@ -773,10 +984,10 @@ class NetworkManager:
             # case function is called as blocking and not gathered still not one IP resolved
             else:
                 # feed the wdt
-                self.feed_wdt(label="get coro and task for DNS")
+                self.feed_wdt("get coro and task for DNS")
                 
                 # waiting time in between repeats (over the same servers)
-                sleep_ms(sleep_for_ms) 
+                await asyncio.sleep_ms(_jitter(sleep_for_ms))
         
         # after all the iteration over NTP servers and repetitions
         
@@ -788,23 +999,63 @@ class NetworkManager:
             # return None
             return None
         
+        # time reference of the resolution, for the TTL
+        if not internet_check:
+            self._ntp_ip_ts = time()
+        
         # case the dict is not empty it gets returned
         return ntp_servers_ip
     
     
     
     
+    async def _deferred_refresh(self):
+        """
+        Resolve again the NTP servers, updating (in place) the ntp_servers_ip dict booked by refresh_ntp_ip.
+        Called by get_ntp_time once the NTP queries are over (no allocations in between t1 and t4), and
+        before the wlan gets disabled.
+        """
+        ntp_servers_ip = self._ntp_ip_refresh_pending
+        self._ntp_ip_refresh_pending = None
+        try:
+            new_ntp_servers_ip = await self.get_ntp_servers_ip(repeats=1, blocking=False)
+            if new_ntp_servers_ip:
+                ntp_servers_ip.update(new_ntp_servers_ip)
+        except Exception as e:
+            print(f"[ERROR]   Refresh of the NTP servers IPs failed: {e}")
+    
+    
+    
+    
     async def refresh_ntp_ip(self, current_ticks_ms, ntp_servers_ip, blocking=False):
-        """Function to get again the IP resolved."""
+        """
+        Function to get again the IP resolved.
+        Within half of the TTL (NTP_IP_TTL_MS) the cached IPs are returned; within the second half
+        the cached IPs are returned, and they get refreshed right after the next NTP queries (by
+        get_ntp_time); after the TTL expiry the IPs are resolved again before returning.
+        """
         
         # time reference
         t_start_ms = ticks_ms()
+        
+        # case the cached IPs are still valid
+        if ntp_servers_ip and self._ntp_ip_ts is not None:
+            age_ms = (time() - self._ntp_ip_ts) * 1000
+            
+            # case cached IPs within half of the TTL (a negative age means the RTC got reset)
+            if 0 <= age_ms < self._ntp_ip_ttl_ms // 2:
+                return ntp_servers_ip, t_start_ms
+            
+            # case cached IPs within the TTL: used, and refreshed once the NTP queries are over
+            if 0 <= age_ms < self._ntp_ip_ttl_ms:
+                self._ntp_ip_refresh_pending = ntp_servers_ip
+                return ntp_servers_ip, t_start_ms
 
         # force garbage collection
         gc.collect()
         
         # feed the wdt
-        self.feed_wdt(label="DNS resolution refresh")
+        self.feed_wdt("DNS resolution refresh")
         
         if config.DEBUG:
             print("[DEBUG]    refreshing the NTP servers IPs ...")
@@ -835,11 +1086,8 @@ class NetworkManager:
             # iterate for the number of attempts
             for attempt in range(attempts):
                 
-                # force garbage collection
-                gc.collect()
-                
                 # feed the wdt
-                self.feed_wdt(label="iterates DNS resolution")
+                self.feed_wdt("iterates DNS resolution")
                 
                 # call the function to get the NTP servers dict {servers:IP}, by passing the number of attempts
                 ntp_servers_ip = await self.get_ntp_servers_ip(repeats=3, blocking=blocking)
@@ -852,8 +1100,8 @@ class NetworkManager:
                     # return the NTP servers dict {servers:IP} and the time
                     return ntp_servers_ip, ticks_ms()
                 
-                # case of not enough NTP servers IP resolved, sleep time in between attempts
-                sleep_ms(500)
+                # case of not enough NTP servers IP resolved, sleep time (with jitter) in between attempts
+                await asyncio.sleep_ms(_jitter(500))
         
         if config.DEBUG:
             print(f"[ERROR]   could not resolve the DNS of NTP servers, out of {attempts+1} attempts")
@@ -866,22 +1114,224 @@ class NetworkManager:
     
     
     
+    def _reset_ntp_best(self):
+        """Reset the count of acceptable NTP replies and the best (lowest latency) one."""
+        self._ntp_samples = 0
+        self._best_latency_ms = 100000
+        self._best_offset_ms = None
+        self._best_epoch_s = None
+        self._best_sync_ticks_ms = None
+        self._best_t4_ms = None
+        self._ntp_short_circuit = False
+    
+    
+    
+    
+    async def _query_ntp_server(self, server, addr, attempts, max_ntp_offset_ms):
+        """
+        Inquire the NTP server (at addr) for attempts times, on its own non-blocking UDP socket.
+        each acceptable reply is counted, and kept when having the lowest latency so far; a reply
+        with an offset larger than max_ntp_offset_ms resets the internal RTC instead.
+        the replies are awaited without blocking, so that the other servers are inquired in parallel.
+        """
+        
+        if config.DEBUG:
+            print(f"[NTP]      connecting to server {server} at IP {addr[0]} PORT {addr[1]}")
+        
+        # NTP packet and reply buffer, reused by the attempts
+        NTP_QUERY = bytearray(_NTP_QUERY_TEMPLATE)
+        msg = bytearray(48)
+        
+        # stream reader awaiting the replies on the socket, (re)made when the socket is (re)made
+        reader = None
+        
+        # local bindings of the timestamp (un)packing and of the NTP delta, used in the attempts loop
+        _pack, _unpack, ts_fmt = pack_into, unpack_from, _NTP_TS_FMT
+        ntp_delta = self.ntp_delta
+        
+        # guard time between queries to the same server, as the NTP pools rate-limit the bursts
+        guard_ms = config.NTP_INTER_ATTEMPT_MS
+        
+        # latency and offset of a reply good enough to end the sync
+        short_latency_ms = config.NTP_SHORT_CIRCUIT_LATENCY_MS
+        short_offset_ms = config.NTP_SHORT_CIRCUIT_MAX_OFFSET_MS
+        
+        # the query ends normally, also when leaving the attempts loop early (KoD, fast reply)
+        completed = False
+        try:
+            for attempt in range(attempts):
+                self.feed_wdt("get_ntp_time_2")
+                
+                # case not the first attempt: wait the guard time (plus up to 20% jitter), feeding the wdt
+                if attempt:
+                    wait_ms = _jitter(guard_ms, 0.1) + guard_ms // 10
+                    for _ in range(wait_ms // 200):
+                        await asyncio.sleep_ms(200)
+                        self.feed_wdt("get_ntp_time_2")
+                    await asyncio.sleep_ms(wait_ms % 200)
+                
+                try:
+                    # UDP socket, reused across attempts and syncs
+                    s = self._get_ntp_socket(server)
+                    if reader is None:
+                        reader = asyncio.StreamReader(s)
+                    
+                    # RTC resets (by any of the parallel queries) until now
+                    rtc_resets = self._rtc_resets
+                    
+                    # get current epoch time with nanosecond precision for t1
+                    t_ns = time_ns()
+                    secs, nanos = divmod(t_ns, 1_000_000_000)
+                    
+                    # convert t1 to NTP format
+                    t1_ntp_secs = secs + ntp_delta
+                    t1_ntp_frac = (nanos << 32) // 1_000_000_000
+                    t1_ms = t_ns // 1_000_000  # convert ns to ms
+                    
+                    # prepare packet for NTP query with included timestamp
+                    _pack(ts_fmt, NTP_QUERY, 40, t1_ntp_secs, t1_ntp_frac)
+                    
+                    # feed the wdt
+                    self.feed_wdt("get_ntp_time_3")
+                    
+                    # send packet to NTP server
+                    s.sendto(NTP_QUERY, addr)
+                    
+                    # feed the wdt
+                    self.feed_wdt("get_ntp_time_4")
+                    
+                    try:
+                        # await the packet from NTP server into msg, the event loop wakes this task when data is ready
+                        n = await asyncio.wait_for_ms(reader.readinto(msg), 2000)
+                    except Exception as e:
+                        # a late reply would be read by the next attempt: the socket is released, a new one is created
+                        self._close_ntp_socket(server)
+                        reader = None
+                        continue  # skip to next attempt
+                    
+                    # record receive time of NTP packet
+                    t4_ns = time_ns()            # t4 in nanoseconds
+                    tick_ms = ticks_ms()         # time tick (in ms)
+                    t4_ms = t4_ns // 1_000_000   # t4 in milliseconds
+                    
+                    # the socket is reused: discard late replies to a previous query (originate timestamp differs)
+                    if n != 48 or _unpack(ts_fmt, msg, 24) != (t1_ntp_secs, t1_ntp_frac):
+                        continue  # skip to next attempt
+                    
+                    # case Kiss-o'-Death reply (stratum 0): the server asks to slow down or to stop querying
+                    if msg[1] == 0 and msg[12:16] in (b"RATE", b"DENY", b"KOD "):
+                        if config.DEBUG:
+                            print(f"[NTP]      server {server} replied with KoD {msg[12:16]}, no further queries")
+                        break
+                    
+                    # case bogus reply: LI=3 (server clock not synchronized), stratum 0 or above 15,
+                    # or transmit timestamp not set; such a reply must not drive the RTC
+                    stratum = msg[1]
+                    t3_secs, t3_frac = _unpack(ts_fmt, msg, 40)  # NTP server transmit time
+                    if msg[0] >> 6 == 3 or stratum == 0 or stratum > 15 or (t3_secs == 0 and t3_frac == 0):
+                        if config.DEBUG:
+                            print(f"[NTP]      server {server} replied with a bogus packet, reply discarded")
+                        continue  # skip to next attempt
+                    
+                    # the internal RTC got reset meanwhile, by another query: t1 and t4 are not comparable
+                    if self._rtc_resets != rtc_resets:
+                        continue  # skip to next attempt
+                    
+                    self.feed_wdt("get_ntp_time_5")  # feed the wdt
+                    
+                    # extract NTP server timestamps
+                    t2_secs, t2_frac = _unpack(ts_fmt, msg, 32)  # NTP server receive time
+                    
+                    # convert server timestamps to integer milliseconds (fixed-point, rounded)
+                    t2_ms_tot = (t2_secs - ntp_delta) * 1000 + ((t2_frac * 1000 + _NTP_FRAC_HALF) >> 32)
+                    t3_ms_tot = (t3_secs - ntp_delta) * 1000 + ((t3_frac * 1000 + _NTP_FRAC_HALF) >> 32)
+                    
+                    # calculate offset_ms and rnd_latency_ms (see https://en.wikipedia.org/wiki/Network_Time_Protocol)
+                    rnd_latency_ms = (t4_ms - t1_ms) - (t3_ms_tot - t2_ms_tot)
+                    offset_ms = ((t2_ms_tot - t1_ms) + (t3_ms_tot - t4_ms)) >> 1
+                    
+                    # get server's transmit time (ground truth)
+                    server_time_s = t3_secs - ntp_delta
+                    server_time_ms = (t3_frac * 1000 + _NTP_FRAC_HALF) >> 32
+                    
+                    # add half the network rnd_latency_ms for better accuracy
+                    carry_s, epoch_fract_ms = divmod(server_time_ms + (rnd_latency_ms >> 1), 1000)
+                    epoch_s = server_time_s + carry_s
+                    
+                    # the first positive NTP sync is used to set a first RTC value.
+                    # the following NTP syncs will have a more meaninfull offset
+                    if abs(offset_ms) > max_ntp_offset_ms:  # case time offset_ms from NTP not acceptable
+                        # from epoch (secs) to UTC (time.struct_time obj)
+                        time_tuple = gmtime(epoch_s)        
+                        
+                        # set the rtc with the just obtained UTC time 
+                        # note: the time zone will only applied to the displayed time
+                        self.rtc.datetime((time_tuple[0], time_tuple[1], time_tuple[2],
+                                           time_tuple[6], time_tuple[3], time_tuple[4],
+                                           time_tuple[5], epoch_fract_ms * 1000))
+                        
+                        # the replies collected so far refer to the previous RTC time
+                        self._rtc_resets += 1
+                        self._reset_ntp_best()
+                        
+                        if config.DEBUG:
+                            print(f"[NTP]      NTP absolute offset (ms): {abs(offset_ms)} vs max acceptable of {max_ntp_offset_ms}")
+                            print(f"[NTP]      necsssary to updated the internal ESP32 RTC ....")
+                            print(f"[NTP]      full RTC reset to UTC time: {epoch_s}.{epoch_fract_ms:03d}")
+                            print(f"[NTP]      note the time zone will be applied to the DS3231 RTC")
+                    
+                    else:
+                        self._ntp_samples += 1
+                        
+                        # track the reply with lowest latency
+                        if abs(rnd_latency_ms) < self._best_latency_ms:
+                            self._best_latency_ms = abs(rnd_latency_ms)
+                            self._best_offset_ms = offset_ms
+                            self._best_epoch_s = epoch_s
+                            self._best_sync_ticks_ms = tick_ms
+                            self._best_t4_ms = t4_ms
+                        
+                        # case fast reply with small offset: more queries would not improve the accuracy
+                        if abs(rnd_latency_ms) < short_latency_ms and abs(offset_ms) < short_offset_ms:
+                            self._ntp_short_circuit = True
+                            break
+                    
+                    self.feed_wdt("get_ntp_time_6")   # feed the wdt
+                
+                except Exception as e:
+                    # the socket is released, a new one is created at the next attempt
+                    self.feed_wdt("get_ntp_time_4")
+                    self._close_ntp_socket(server)
+                    reader = None
+                    if config.DEBUG:
+                        print(f"[NTP]      sync attempt {attempt+1} of {attempts} with server {server} failed: {e}")
+            
+            completed = True
+        
+        finally:
+            # case the query got cancelled (or failed): a late reply could still reach the socket, therefore released
+            if not completed:
+                self._close_ntp_socket(server)
+    
+    
+    
+    
     async def get_ntp_time(self, ntp_servers_ip, attempts=config.NTP_SERVER_ATTEMPTS, max_ntp_offset_ms=config.MAX_NTP_OFFSET_MS, blocking=False):
         """
         NTP sync with timestamp calculations and Wi-Fi management
         the returned time-related variables (epoch_s, epoch_ms) have a meaning when linked to tick_ms time reference,
         (sync_ticks_ms) being the tick of the internal oscillator at the NTP data receival corrected by offset_ms.
-        the NTP server is inquired NTP_SERVER_ATTEMPTS times, and the reply with smallest latency is used.
+        each NTP server is inquired up to NTP_SERVER_ATTEMPTS times, and the reply with smallest latency is used.
         in the case the NTP time offset is > MAX_NTP_OFFSET_MS then the internal RTC gets updated
-        the different NTP servers are inquired in the provided order.
-        the first server replying to the inquiry will be used, the other servers are for back up.
+        the NTP servers are inquired in parallel, the sync ends once NTP_QUORUM acceptable replies are received,
+        or at the first reply faster than NTP_SHORT_CIRCUIT_LATENCY_MS and within NTP_SHORT_CIRCUIT_MAX_OFFSET_MS.
         """
         
         t_start = ticks_ms()
         
         self.ntp_bool = False
         
-        self.feed_wdt(label="get_ntp_time_1")
+        self.feed_wdt("get_ntp_time_1")
         gc.collect()
         
         MIN_NTP_SERVER_ATTEMPTS = 3 # minimum number of NTP sync attempts
@@ -890,9 +1340,6 @@ class NetworkManager:
         attempts = MIN_NTP_SERVER_ATTEMPTS if attempts < MIN_NTP_SERVER_ATTEMPTS else attempts
         
         epoch_s = None
-
-        min_latency_ms = 100000
-        best = 0
         
         # ensure wlan is active and connected
         await self.ensure_wlan(blocking=blocking)
@@ -901,190 +1348,80 @@ class NetworkManager:
             if config.DEBUG:
                 print("[ERROR]    NTP sync failed due to WiFi issues\n")
             return None, None, None
-
         
-        for server in config.NTP_SERVERS:
-            self.feed_wdt(label="get_ntp_time_2")
-            
-            # case no ip for that server (server not reached after booting)
-            if server not in ntp_servers_ip.keys():
-                continue
-            
-            # case ntp sync was successfull
-            if self.ntp_bool:
-                break
-            
-            # retrive the ntp server address (IP and PORT)
-            addr = ntp_servers_ip[server]
+        # acceptable replies counter and best reply, updated by the parallel queries
+        self._reset_ntp_best()
+        
+        # servers with a known IP (servers not reached after booting are skipped), in a random order
+        # (Fisher-Yates shuffle) so that repeated syncs do not always query the same server first
+        servers = [server for server in config.NTP_SERVERS if server in ntp_servers_ip]
+        for i in range(len(servers) - 1, 0, -1):
+            j = getrandbits(16) % (i + 1)
+            servers[i], servers[j] = servers[j], servers[i]
+        
+        # one query task per server
+        tasks = [asyncio.create_task(self._query_ntp_server(server, ntp_servers_ip[server], attempts,
+                                                            max_ntp_offset_ms))
+                 for server in servers]
+        
+        # number of acceptable replies ending the sync
+        quorum = config.NTP_QUORUM
+        
+        try:
+            # wait for a fast reply, or for the quorum of replies, or for all the queries to be done
+            while not self._ntp_short_circuit and self._ntp_samples < quorum and not all(task.done() for task in tasks):
+                self._maybe_feed("get_ntp_time_7")
+                await asyncio.sleep_ms(20)
+        
+        except Exception as e:
             if config.DEBUG:
-                print(f"[NTP]      connecting to server {server} at IP {addr[0]} PORT {addr[1]}")
+                print(f"[ERROR]   sync failure with the NTP servers: {e}")
+        
+        finally:
+            # the queries still running are not needed anymore
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        
+        # garbage collection once the queries are over, never in between t1 and t4
+        gc.collect()
+        
+        # case a refresh of the NTP servers IPs is due: done now, the queries are over and the wlan still active
+        if self._ntp_ip_refresh_pending is not None:
+            await self._deferred_refresh()
+        
+        if config.LIGHTSLEEP_USAGE:
+            if self.wlan.active():
+                self.disable_wifi()
+        
+        self.feed_wdt("get_ntp_time_7")
+        
+        # case at least one acceptable reply
+        if self._ntp_samples:
+            # epoch_s is the NTP time referred to the sync_ticks_ms moment
+            # defined as the internal ticks_ms when NTP was received
+            sync_ticks_ms =   self._best_sync_ticks_ms
+            rnd_latency_ms =  self._best_latency_ms
+            offset_ms =       self._best_offset_ms
+            epoch_s =         self._best_epoch_s
+            epoch_ms =        self._best_t4_ms + offset_ms
             
-            try:
-                # create NTP packet
-                NTP_QUERY = bytearray(48)
-                NTP_QUERY[0] = 0x1B  # LI=0, VN=3, Mode=3 (client)
-                
-                # create UDP socket
-                s = socket(AF_INET, SOCK_DGRAM)
-                s.settimeout(2)
-                
-                # --- new section: collect all results for later selection ---
-                ntp_results = []  # store (offset_ms, rnd_latency_ms, t4_ms, epoch_s, epoch_fract_ms)
-                
-                index = 0
-                for attempt in range(attempts):
-                    self.feed_wdt(label="get_ntp_time_2")
-                    
-                    try:
-                        # get current epoch time with nanosecond precision for t1
-                        t_ns = time_ns()
-                        secs = t_ns // 1_000_000_000
-                        nanos = t_ns % 1_000_000_000
-                        
-                        # convert t1 to NTP format
-                        t1_ntp_secs = secs + self.ntp_delta
-                        t1_ntp_frac = int((nanos * (1 << 32)) // 1_000_000_000)
-                        t1_ms = t_ns // 1_000_000  # convert ns to ms
-                        
-                        # prepare packet for NTP query with included timestamp
-                        pack_into("!II", NTP_QUERY, 40, t1_ntp_secs, t1_ntp_frac)
-                        
-                        # feed the wdt
-                        self.feed_wdt(label="get_ntp_time_3")
-                        
-                        # send packet to NTP server
-                        s.sendto(NTP_QUERY, addr)
-                        
-                        # feed the wdt
-                        self.feed_wdt(label="get_ntp_time_4")
-                        
-                        try:
-                            # receive packet from NTP server
-                            msg = s.recv(48)
-                            error = False
-                        except Exception as e:
-                            error = True
-                            continue  # skip to next attempt
-                        
-                        # record receive time of NTP packet
-                        t4_ns = time_ns()            # t4 in nanoseconds
-                        tick_ms = ticks_ms()         # time tick (in ms)
-                        t4_ms = t4_ns // 1_000_000   # t4 in milliseconds
-                        
-                        self.feed_wdt(label="get_ntp_time_5")  # feed the wdt
-                        
-                        # extract NTP server timestamps
-                        t2_secs, t2_frac = unpack("!II", msg[32:40])  # NTP server receive time
-                        t3_secs, t3_frac = unpack("!II", msg[40:48])  # NTP server transmit time 
-                        
-                        # convert server timestamps to milliseconds (rounded for precision)
-                        t2_ms_tot = (t2_secs - self.ntp_delta) * 1000 + round(t2_frac * 1000 / (1 << 32))
-                        t3_ms_tot = (t3_secs - self.ntp_delta) * 1000 + round(t3_frac * 1000 / (1 << 32))
-                        
-                        # calculate offset_ms and rnd_latency_ms (see https://en.wikipedia.org/wiki/Network_Time_Protocol)
-                        rnd_latency_ms = (t4_ms - t1_ms) - (t3_ms_tot - t2_ms_tot)
-                        offset_ms = ((t2_ms_tot - t1_ms) + (t3_ms_tot - t4_ms)) / 2
-                        
-                        # get server's transmit time (ground truth)
-                        server_time_s = t3_secs - self.ntp_delta
-                        server_time_ms = round(t3_frac * 1000 / (1 << 32))
-                        
-                        # add half the network rnd_latency_ms for better accuracy
-                        epoch_ms = server_time_ms + (rnd_latency_ms / 2)
-                        epoch_s = server_time_s + int(epoch_ms // 1000)
-                        epoch_fract_ms = epoch_ms % 1000
-                        
-                        # the first positive NTP sync is used to set a first RTC value.
-                        # the following NTP syncs will have a more meaninfull offset
-                        if abs(offset_ms) > max_ntp_offset_ms:  # case time offset_ms from NTP not acceptable
-                            # from epoch (secs) to UTC (time.struct_time obj)
-                            time_tuple = gmtime(epoch_s)        
-                            
-                            # set the rtc with the just obtained UTC time 
-                            # note: the time zone will only applied to the displayed time
-                            self.rtc.datetime((time_tuple[0], time_tuple[1], time_tuple[2],
-                                               time_tuple[6], time_tuple[3], time_tuple[4],
-                                               time_tuple[5], int(epoch_fract_ms*1000)))
-                            
-                            if config.DEBUG:
-                                print(f"[NTP]      NTP absolute offset (ms): {abs(offset_ms)} vs max acceptable of {max_ntp_offset_ms}")
-                                print(f"[NTP]      necsssary to updated the internal ESP32 RTC ....")
-                                print(f"[NTP]      full RTC reset to UTC time: {epoch_s}.{int(epoch_fract_ms):03d}")
-                                print(f"[NTP]      note the time zone will be applied to the DS3231 RTC")
-                        
-                        else:
-                            # store result for later evaluation
-                            ntp_results.append({
-                                "latency_ms": rnd_latency_ms,
-                                "offset_ms": offset_ms,
-                                "epoch_s": epoch_s,
-                                "epoch_fract_ms": epoch_fract_ms,
-                                "sync_ticks_ms": tick_ms,
-                                "t4_ms": t4_ms
-                            })
-                            
-                            # track the NTP pool with lowest latency
-                            if abs(rnd_latency_ms) < min_latency_ms:
-                                min_latency_ms = abs(rnd_latency_ms)
-                                best = index
-                            index += 1
-                        
-                        self.feed_wdt(label="get_ntp_time_6")   # feed the wdt
-                    
-                    except Exception as e:
-                        if s:
-                            self.feed_wdt(label="get_ntp_time_4")
-                            s.close()
-                        if config.DEBUG:
-                            print(f"[NTP]      sync attempt {attempt+1} of {attempts} failed: {e}")
-                
-                s.close()    # closing the socket
-                
-                if config.LIGHTSLEEP_USAGE:
-                    if self.wlan.active():
-                        self.disable_wifi()
-                
-                self.feed_wdt(label="get_ntp_time_7")
-                
-                # case ntp_results got populated
-                if ntp_results:
-                    # epoch_s is the NTP time referred to the sync_ticks_ms moment
-                    # defined as the internal ticks_ms when NTP was received
-                    epoch_ms =  round(ntp_results[best]["t4_ms"] + offset_ms)
-                    sync_ticks_ms =   ntp_results[best]["sync_ticks_ms"]
-                    rnd_latency_ms =  ntp_results[best]["latency_ms"]
-                    offset_ms =       ntp_results[best]["offset_ms"]
-                    epoch_s =         ntp_results[best]["epoch_s"]
-                    
-                    # normalize offset to keep abs(offset_ms) ≤ 500 ms
-                    if abs(offset_ms) >= 1000:
-                        delta_s = int(offset_ms // 1000)
-                        epoch_s += delta_s
-                        offset_ms -= delta_s * 1000
+            # normalize offset to keep offset_ms within -500 and 500 ms (integer arithmetic)
+            delta_s, offset_ms = divmod(offset_ms + 500, 1000)
+            offset_ms -= 500
+            epoch_s += delta_s
 
-                    # fractional part of offset_ms
-                    if offset_ms > 500:
-                        epoch_s += 1
-                        offset_ms -= 1000
-                    elif offset_ms < -500:
-                        epoch_s -= 1
-                        offset_ms += 1000
-
-                    epoch_fract_ms =   epoch_ms % 1000
-                    self.ntp_bool = True
-                    
-            except Exception as e:
-                if config.DEBUG:
-                    print(f"[ERROR]   sync failure with server {server}")
+            epoch_fract_ms =   epoch_ms % 1000
+            self.ntp_bool = True
         
-        self.feed_wdt(label="get_ntp_time_8")
+        self.feed_wdt("get_ntp_time_8")
         
         tot_time_ms = ticks_diff(ticks_ms(), t_start)
-        self.feed_wdt(label="get_ntp_time_9")
+        self.feed_wdt("get_ntp_time_9")
         
         if self.ntp_bool:
             if config.DEBUG:
-                print(f"[NTP]      NTP sync success (best sample) taking overall {tot_time_ms} ms ")
+                print(f"[NTP]      NTP sync success (best of {self._ntp_samples} samples) taking overall {tot_time_ms} ms ")
                 print(f"[NTP]      NTP latency round-trip time (ms) {rnd_latency_ms}")
                 print(f"[NTP]      NTP offset (ms) {offset_ms}")
             return epoch_s, epoch_fract_ms, sync_ticks_ms
@@ -34,7 +34,7 @@ SOFTWARE.
 from ds3231_driver import DS3231
 
 # standard modules
-from utime import gmtime, mktime, ticks_diff, sleep_ms
+from utime import gmtime, mktime, ticks_diff
 from machine import SoftI2C, Pin
 import uasyncio as asyncio
 import ujson as json
@@ -44,6 +44,37 @@ SDA_PIN = 2
 SCL_PIN = 1
 DS3231_PWR_PIN = 3
 
+# zero padded two digits strings, indexed by their value
+_TWO_DIGITS = ["%02d" % i for i in range(100)]
+
+# month, weekday and nth-weekday abbreviations used by the DST rules
+_MONTHS = {"JAN":1,"FEB":2,"MAR":3,"APR":4,"MAY":5,"JUN":6,
+           "JUL":7,"AUG":8,"SEP":9,"OCT":10,"NOV":11,"DEC":12}
+_WEEKDAYS = {"mon":0,"tue":1,"wed":2,"thu":3,"fri":4,"sat":5,"sun":6}
+_WHICH = {"1st":0,"2nd":1,"3rd":2,"4th":3,"last":-1}
+
+# days per month (not leap year)
+DAYS_IN_MONTH = (31,28,31,30,31,30,31,31,30,31,30,31)
+
+
+class _DS3231Power:
+    """
+    Async context manager powering the DS3231 module for the enclosed operations:
+    the module is powered up (and awaited to settle) once, and powered down also on errors.
+    """
+    def __init__(self, tm, pwr_up_time_ms):
+        self.tm = tm
+        self.pwr_up_time_ms = pwr_up_time_ms
+    
+    async def __aenter__(self):
+        self.tm.ds3231_pwr.value(1)
+        await asyncio.sleep_ms(self.pwr_up_time_ms)
+        return self.tm.ds
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self.tm.ds3231_pwr.value(0)
+
+
 
 class TimeManager:
     def __init__(self, config):
@@ -55,6 +86,25 @@ class TimeManager:
         self.UTC_TZ = getattr(config, "UTC_TZ", 0)
         self.degrees = config.TEMP_DEGREES
         
+        # DST rule of the region, pre-parsed in a numeric tuple (None when DST does not apply)
+        self._active_rule = None
+        if self.is_dst_enabled:
+            rule = self.dst_rules.get(self.region, self.dst_rules.get("NONE", {}))
+            self._active_rule = self._compile_rule(rule)
+        
+        # DST start and end days, cached for the year they refer to
+        self._dst_cache_year = None
+        self._dst_cache = None
+        
+        # UTC offset (hours), cached for the epoch range in between two DST transitions
+        self._tz_cache_valid_from_s = 0
+        self._tz_cache_valid_until_s = 0
+        self._tz_cache_hours = 0
+        
+        # date fields (day, weekday, date string), cached for the day they refer to
+        self._date_cache_key = None
+        self._date_cache = None
+        
         # initialize the ds3231_pwr pin
         self.ds3231_pwr = Pin(DS3231_PWR_PIN, Pin.OUT)
         self.ds3231_pwr.value(0)
@@ -77,10 +127,8 @@ class TimeManager:
         
         try:
             # writes time_tuple_utc to DS3231 flash memory
-            self.ds3231_pwr.value(1)
-            sleep_ms(pwr_up_time_ms)
-            self.ds.datetime(time_tuple_utc)
-            self.ds3231_pwr.value(0)
+            async with _DS3231Power(self, pwr_up_time_ms):
+                self.ds.datetime(time_tuple_utc)
             return True
         except:
             return False
@@ -89,13 +137,8 @@ class TimeManager:
     
     async def get_DS3231_time(self, pwr_up_time_ms = 5):
         try:
-            self.ds3231_pwr.value(1)
-            sleep_ms(pwr_up_time_ms)
-            
-            # reads time_tuple from DS3231 flash memory
-            time_tuple = self.ds.datetime()
-            self.ds3231_pwr.value(0)
-            return time_tuple
+            async with _DS3231Power(self, pwr_up_time_ms):
+                return self._raw_datetime()
         except:
             return None
     
@@ -103,21 +146,23 @@ class TimeManager:
     
     async def get_DS3231_temperature(self, pwr_up_time_ms = 5):
         try:
-            self.ds3231_pwr.value(1)
-            sleep_ms(pwr_up_time_ms)
-            
-            # reads ds3231 temperature from DS3231 flash memory
-            ds3231_temp = self.ds.read_temperature()
-            self.ds3231_pwr.value(0)
-            
-            if self.degrees == 'C':
-                return ds3231_temp
-            elif self.degrees == 'F':
-                return 32 + 9/5 * ds3231_temp
-            else:
-                print("[ERROR]   TEMP_DEGREES at config.py must be 'C'or 'F'")
-                raise
-        
+            async with _DS3231Power(self, pwr_up_time_ms):
+                ds3231_temp = self._raw_temperature()
+            return self._to_degrees(ds3231_temp)
+        except:
+            return None
+    
+    
+    
+    async def get_DS3231_time_temperature(self, pwr_up_time_ms = 5):
+        """
+        Reads time and temperature with a single I2C transaction (registers 0x00 to 0x12).
+        Returns None in case of errors.
+        """
+        try:
+            async with _DS3231Power(self, pwr_up_time_ms):
+                time_tuple, ds3231_temp = self.ds.read_all()
+            return time_tuple, self._to_degrees(ds3231_temp)
         except:
             return None
     
@@ -125,13 +170,8 @@ class TimeManager:
     
     async def read_DS3231_aging(self, pwr_up_time_ms = 5):
         try:
-            self.ds3231_pwr.value(1)
-            sleep_ms(pwr_up_time_ms)
-            
-            # reads ds3231 aging from DS3231 flash memory
-            ds3231_aging = self.ds.read_aging()
-            self.ds3231_pwr.value(0)
-            return ds3231_aging
+            async with _DS3231Power(self, pwr_up_time_ms):
+                return self._raw_aging()
         except:
             return None
     
@@ -139,18 +179,79 @@ class TimeManager:
     
     async def write_DS3231_aging(self, value, pwr_up_time_ms = 5):
         try:
-            self.ds3231_pwr.value(1)
-            sleep_ms(pwr_up_time_ms)
-            
-            # reads ds3231 aging from DS3231 flash memory
-            ds3231_aging = self.ds.write_aging(value = value)
-            self.ds3231_pwr.value(0)
+            async with _DS3231Power(self, pwr_up_time_ms):
+                self.ds.write_aging(value = value)
             return True
         except:
             return False
     
     
     
+    async def commit_and_verify_aging(self, value, pwr_up_time_ms = 5, timeout_ms = 300):
+        """
+        Writes the aging factor and forces a temperature conversion (applying the new aging to the TCXO),
+        then polls until the conversion is completed and reads the aging factor back, within a single
+        DS3231 power-up window. Returns the aging factor read back, or None in case of errors.
+        """
+        try:
+            async with _DS3231Power(self, pwr_up_time_ms):
+                self.ds.write_aging(value = value)
+                if self.ds.convert_temperature():
+                    waited_ms = 0
+                    while not self.ds.conversion_done() and waited_ms < timeout_ms:
+                        await asyncio.sleep_ms(10)
+                        waited_ms += 10
+                return self._raw_aging()
+        except:
+            return None
+    
+    
+    
+    async def get_DS3231_status(self, pwr_up_time_ms = 5):
+        """
+        Reads time, temperature and aging factor within a single DS3231 power-up window.
+        Returns (None, None, None) in case of errors.
+        """
+        try:
+            async with _DS3231Power(self, pwr_up_time_ms):
+                time_tuple = self._raw_datetime()
+                ds3231_temp = self._raw_temperature()
+                ds3231_aging = self._raw_aging()
+            return time_tuple, self._to_degrees(ds3231_temp), ds3231_aging
+        except:
+            return None, None, None
+    
+    
+    
+    def _raw_datetime(self):
+        # reads time_tuple from DS3231 flash memory (DS3231 already powered)
+        return self.ds.datetime()
+    
+    
+    
+    def _raw_temperature(self):
+        # reads ds3231 temperature from DS3231 flash memory (DS3231 already powered)
+        return self.ds.read_temperature()
+    
+    
+    
+    def _raw_aging(self):
+        # reads ds3231 aging from DS3231 flash memory (DS3231 already powered)
+        return self.ds.read_aging()
+    
+    
+    
+    def _to_degrees(self, ds3231_temp):
+        if self.degrees == 'C':
+            return ds3231_temp
+        elif self.degrees == 'F':
+            return 32 + 1.8 * ds3231_temp   # 9/5, as a constant
+        else:
+            print("[ERROR]   TEMP_DEGREES at config.py must be 'C'or 'F'")
+            raise ValueError("TEMP_DEGREES")
+    
+    
+    
     def epoch_to_timetuple(self, epoch_s):
         utc_tz_dst = self.get_UTC_TZ(epoch_s)         # DST CALCULATION
         local_epoch_s = epoch_s + 3600 * utc_tz_dst   # local epoch in secs
@@ -163,30 +264,28 @@ class TimeManager:
         Calculates current UTC offset including DST, based on region rules.
         Returns offset in hours.
         """
-        if not self.is_dst_enabled:
+        rule = self._active_rule
+        if rule is None:
             return self.UTC_TZ
 
-        rule = self.dst_rules.get(self.region, self.dst_rules.get("NONE", {}))
-        if not rule or not rule.get("start") or not rule.get("end"):
-            return self.UTC_TZ
+        # case the epoch is within the range of the cached UTC offset
+        if self._tz_cache_valid_from_s <= utc_epoch_time < self._tz_cache_valid_until_s:
+            return self._tz_cache_hours
+
+        sm, start_w, start_d, start_h, em, end_w, end_d, end_h, offset_hr, hemisphere = rule
 
         t = gmtime(utc_epoch_time)
         year, month, day, hour = t[0], t[1], t[2], t[3]
 
-        start_m, start_w, start_d, start_h = rule["start"]
-        end_m, end_w, end_d, end_h = rule["end"]
-
-        start_day = self._get_rule_day(year, start_m, start_w, start_d)
-        end_day = self._get_rule_day(year, end_m, end_w, end_d)
-
-        months = {"JAN":1,"FEB":2,"MAR":3,"APR":4,"MAY":5,"JUN":6,
-                  "JUL":7,"AUG":8,"SEP":9,"OCT":10,"NOV":11,"DEC":12}
-
-        sm = months[start_m]
-        em = months[end_m]
+        # the DST days are only calculated when the year changes
+        if year != self._dst_cache_year:
+            self._dst_cache = (self._get_rule_day(year, sm, start_w, start_d),
+                               self._get_rule_day(year, em, end_w, end_d))
+            self._dst_cache_year = year
+        start_day, end_day = self._dst_cache
 
         in_dst = False
-        if sm < em:  # northern hemisphere (e.g. EU, US)
+        if hemisphere == 0:  # northern hemisphere (e.g. EU, US)
             if (month > sm and month < em) or \
                (month == sm and (day > start_day or (day == start_day and hour >= start_h))) or \
                (month == em and (day < end_day or (day == end_day and hour < end_h))):
@@ -197,9 +296,41 @@ class TimeManager:
                     (month == sm and (day < start_day or (day == start_day and hour < start_h)))):
                 in_dst = True
 
-        offset_hr = (rule.get("offset", 3600) // 3600) if in_dst else 0
-        
-        return self.UTC_TZ + offset_hr
+        tz_hours = self.UTC_TZ + offset_hr if in_dst else self.UTC_TZ
+
+        # the UTC offset holds in between the DST transitions (or the year limits) around the epoch
+        limits = (mktime((year, 1, 1, 0, 0, 0, 0, 0)),
+                  mktime((year, sm, start_day, start_h, 0, 0, 0, 0)),
+                  mktime((year, em, end_day, end_h, 0, 0, 0, 0)),
+                  mktime((year + 1, 1, 1, 0, 0, 0, 0, 0)))
+        self._tz_cache_valid_from_s = max(limit for limit in limits if limit <= utc_epoch_time)
+        self._tz_cache_valid_until_s = min(limit for limit in limits if limit > utc_epoch_time)
+        self._tz_cache_hours = tz_hours
+
+        return tz_hours
+
+    
+    
+    
+    def _compile_rule(self, rule):
+        """
+        Converts a DST rule (from dst_rules.json) into a numeric tuple:
+        (start_month, start_nth, start_wday, start_h, end_month, end_nth, end_wday, end_h, offset_hr, hemisphere)
+        with nth = -1 for the last weekday of the month, and hemisphere 0 for northern and 1 for southern.
+        Returns None when the rule has no DST.
+        """
+        if not rule or not rule.get("start") or not rule.get("end"):
+            return None
+
+        start_m, start_w, start_d, start_h = rule["start"]
+        end_m, end_w, end_d, end_h = rule["end"]
+
+        sm = _MONTHS[start_m.upper()]
+        em = _MONTHS[end_m.upper()]
+
+        return (sm, _WHICH.get(start_w, 0), _WEEKDAYS[start_d.lower()], start_h,
+                em, _WHICH.get(end_w, 0), _WEEKDAYS[end_d.lower()], end_h,
+                rule.get("offset", 3600) // 3600, 0 if sm < em else 1)
 
     
     
@@ -227,30 +358,19 @@ class TimeManager:
 
     
     
-    def _get_rule_day(self, year, month_abbr, which, weekday_abbr):
-        """Return the day number for nth/last weekday of a month."""
-        months = {"JAN":1,"FEB":2,"MAR":3,"APR":4,"MAY":5,"JUN":6,
-                  "JUL":7,"AUG":8,"SEP":9,"OCT":10,"NOV":11,"DEC":12}
-        weekdays = {"mon":0,"tue":1,"wed":2,"thu":3,"fri":4,"sat":5,"sun":6}
-
-        month = months[month_abbr.upper()]
-        target_wday = weekdays[weekday_abbr.lower()]
+    def _get_rule_day(self, year, month, nth, target_wday):
+        """Return the day number for nth (-1 for last) weekday of a month."""
 
         # simple month length
-        if month in [1,3,5,7,8,10,12]:
-            last_day = 31
-        elif month == 2:
-            last_day = 29 if (year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)) else 28
-        else:
-            last_day = 30
+        leap = year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+        last_day = 29 if (month == 2 and leap) else DAYS_IN_MONTH[month - 1]
 
         # find target weekday
-        if which == "last":
+        if nth < 0:
             for d in range(last_day, last_day - 7, -1):
                 if gmtime(mktime((year, month, d, 12, 0, 0, 0, 0)))[6] == target_wday:
                     return d
         else:
-            nth = {"1st":0,"2nd":1,"3rd":2,"4th":3}.get(which,0)
             for d in range(1, 8):
                 if gmtime(mktime((year, month, d, 12, 0, 0, 0, 0)))[6] == target_wday:
                     return d + nth * 7
@@ -264,7 +384,7 @@ class TimeManager:
         h = seconds // 3600
         m = (seconds % 3600) // 60
         s = seconds % 60
-        return "{:02d}:{:02d}:{:02d}".format(h, m, s)
+        return "%02d:%02d:%02d" % (h, m, s)
     
     
     
@@ -277,10 +397,7 @@ class TimeManager:
     
     
     def get_time(self, time_tuple):
-        HH = "{:02d}".format(time_tuple[3])
-        MM = "{:02d}".format(time_tuple[4])
-        SS = "{:02d}".format(time_tuple[5])
-        return f"{HH}:{MM}:{SS}"
+        return "%02d:%02d:%02d" % (time_tuple[3], time_tuple[4], time_tuple[5])
     
     
     
@@ -300,8 +417,8 @@ class TimeManager:
                 if HH > 12:
                     HH -= 12
         
-        HH = "{:02d}".format(HH)
-        MM = "{:02d}".format(time_tuple[4])
+        HH = _TWO_DIGITS[HH]
+        MM = _TWO_DIGITS[time_tuple[4]]
         return HH[0], HH[1], MM[0], MM[1], am
     
     
@@ -310,19 +427,21 @@ class TimeManager:
         yyyy = time_tuple[0]
         mm   = time_tuple[1]
         dd   = time_tuple[2]
-        day  = self.config.DAYS[time_tuple[6]]
         
-        YYYY = "{:04d}".format(yyyy)
-        M    = "{:02d}".format(mm)
-        D    = "{:02d}".format(dd)
+        # case same day of the previous call, the same tuple is returned (no allocations)
+        key = yyyy * 10_000 + mm * 100 + dd
+        if key == self._date_cache_key:
+            return self._date_cache
+        
+        day  = self.config.DAYS[time_tuple[6]]
         
-        if self.config.DATE_FORMAT == "DMY":
-            d_string = f"{D}-{M}-{YYYY}"
-        elif self.config.DATE_FORMAT == "MDY":
-            d_string = f"{M}-{D}-{YYYY}"
+        if self.config.DATE_FORMAT == "MDY":
+            d_string = "%02d-%02d-%04d" % (mm, dd, yyyy)
         elif self.config.DATE_FORMAT == "YMD":
-            d_string = f"{YYYY}-{M}-{D}"
-        else:
-            d_string = f"{D}-{M}-{YYYY}"
+            d_string = "%04d-%02d-%02d" % (yyyy, mm, dd)
+        else:  # DMY, also the default
+            d_string = "%02d-%02d-%04d" % (dd, mm, yyyy)
         
-        return dd, day, d_string
\ No newline at end of file
+        self._date_cache_key = key
+        self._date_cache = (dd, day, d_string)
+        return self._date_cache
\ No newline at end of file
@@ -30,6 +30,7 @@ SOFTWARE.
 
 from utime import ticks_ms, ticks_diff, gmtime, time
 from machine import WDT
+from collections import deque
 from lib.config import config
 
 class WDTManager:
@@ -37,6 +38,14 @@ class WDTManager:
         self.wdt = None
         self.last_feed_ticks_ms = ticks_ms()
         self.enabled = False
+        self._timeout_ms = config.wdt_timeout_ms
+        self._warn_threshold_ms = int(config.wdt_timeout_ms * config.wdt_warn_fraction)
+        self._urgent_threshold_ms = (self._warn_threshold_ms + self._timeout_ms) // 2
+        
+        # warnings kept in RAM, and written to the log file in batches (also by flush, before each sleep);
+        # the oldest ones are dropped only when the log file cannot be written
+        self._warn_buf = deque((), 32)
+        self._warn_buf_flush_threshold = 16
         
     def initialize(self):
         """Initialize WDT"""
@@ -46,6 +55,11 @@ class WDTManager:
         try: 
             self.wdt = WDT(timeout=config.wdt_timeout_ms)
             self.enabled = True
+            
+            # timeout and warning threshold, cached for the feed calls
+            self._timeout_ms = config.wdt_timeout_ms
+            self._warn_threshold_ms = int(self._timeout_ms * config.wdt_warn_fraction)
+            self._urgent_threshold_ms = (self._warn_threshold_ms + self._timeout_ms) // 2
             print(f"[WDT]      Initialized WDT with timeout: {config.wdt_timeout_ms}ms")
             
         except Exception as e:
@@ -62,20 +76,37 @@ class WDTManager:
             current_ticks = ticks_ms()
             time_since_last_feed = ticks_diff(current_ticks, self.last_feed_ticks_ms)
             
-            # warn if we're getting close to timeout
-            if (time_since_last_feed > config.wdt_timeout_ms * config.wdt_warn_fraction and 
-                time_since_last_feed < config.wdt_timeout_ms):
-                print(f"[WDT] {label}, fed after {time_since_last_feed} ms (timeout={config.wdt_timeout_ms} ms)")
-                
-                # log to file if needed
-                try:
-                    with open(config.WDT_LOG_FILE, "a") as f:
-                        f.write(f"{gmtime(time())} [WDT] {label}, fed after {time_since_last_feed} ms\n")
-                except:
-                    pass
-            
             self.wdt.feed()
             self.last_feed_ticks_ms = current_ticks
             
+            # warn if we're getting close to timeout
+            if self._warn_threshold_ms < time_since_last_feed < self._timeout_ms:
+                print(f"[WDT] {label}, fed after {time_since_last_feed} ms (timeout={self._timeout_ms} ms)")
+                
+                # buffer the warning; the log file gets written (the wdt just fed) once the batch is complete,
+                # or right away when the feed came very close to the timeout (a reset would wipe the RAM)
+                self._warn_buf.append((time(), label, time_since_last_feed))
+                if time_since_last_feed >= self._urgent_threshold_ms or len(self._warn_buf) >= self._warn_buf_flush_threshold:
+                    self.flush()
+            
         except Exception as e:
             print(f"[WDT_FEED_ERROR] {e}")
+    
+    
+    def flush(self):
+        """Write the buffered warnings to the log file, with a single file opening"""
+        if not self._warn_buf:
+            return
+        
+        try:
+            with open(config.WDT_LOG_FILE, "a") as f:
+                while self._warn_buf:
+                    t, label, time_since_last_feed = self._warn_buf.popleft()
+                    f.write(f"{gmtime(t)} [WDT] {label}, fed after {time_since_last_feed} ms\n")
+        except:
+            pass
+    
+    
+    def shutdown(self):
+        """Flush the pending warnings, to be called on exit"""
+        self.flush()
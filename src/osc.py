@@ -46,11 +46,14 @@ SOFTWARE.
 __version__ = "0.0.2"
 
 # import standard modules
-from utime import ticks_ms, sleep_ms, ticks_diff, mktime
+from utime import ticks_ms, sleep_ms, ticks_diff, ticks_add, mktime
 from machine import Pin, freq, lightsleep
+from machine import reset_cause, PWRON_RESET, HARD_RESET, WDT_RESET, DEEPSLEEP_RESET, SOFT_RESET
 import uasyncio as asyncio
 from esp32 import NVS, wake_on_ext0, WAKEUP_ANY_HIGH
-import sys, gc
+from struct import pack, unpack_from
+from os import mkdir, stat
+import sys, gc, micropython
 
 # import OSC custom modules
 from network_manager import NetworkManager
@@ -63,6 +66,59 @@ from lib.config import config
 # pin used to energize the DS3231ZN module
 NTP_SYNC_PIN = 21
 
+# esp32.NVS namespace, and keys of the aging factor and of the tz_dst (Time Zone and DST correction)
+_NVS_NS = "storage"
+_AGING_KEY = "1"
+_TZ_KEY = "2"
+
+# main loop intervals and NTP button debounce time
+_HOUR_MS = 3_600_000
+_DEBOUNCE_MS = 250
+
+# plotting time of the DS3231 battery warning, also the minimum period in between two plots
+_REPLACE_BATT_MS = 60_000
+
+# display refresh target (ms after the minute change), and the correction applied when refreshing too early
+_EPD_TARGET_MS = 4_000
+_EPD_SHIFT_MS = 2_000
+
+# time digits (H1, H2, M1, M2, am) and date fields (dd, day, d_string) plotted when the time is not known
+_NULL_TIME = (0, 0, 0, 0, True)
+_NULL_DATE = (1, 0, "  -  -  ")
+
+# messages of the MCU reset causes
+_RESET_MSGS = {
+    PWRON_RESET: "POWER-ON RESET",
+    HARD_RESET: "HARD RESET",
+    WDT_RESET: "WATCHDOG RESET",
+    DEEPSLEEP_RESET: "DEEPSLEEP WAKE",
+    SOFT_RESET: "SOFT RESET",
+}
+
+# error messages plotted under the OSC logo, as (text, show_time_ms) pairs
+_ERRORS = {
+    "SECRETS": (("ERROR: SECRETS.JSON", 2_000),),
+    "WIFI":    (("ERROR: WIFI NETWORKS", 2_000),),
+    "INET":    (("ERROR: NO INTERNET", 2_000),),
+    "DNS":     (("ERROR: NTP DNS", 0),),
+    "NTP":     (("NTP  SYNC  FAILED ...", 5_000), ("CHECK WIFI NETWORKS", 5_000)),
+}
+
+
+@micropython.native
+def _calc_drift(ntp_epoch_s, last_ntp_epoch_s, ds3231_epoch_s):
+    """
+    Integer math of the DS3231 drift vs NTP, since the last NTP sync.
+    Returns the elapsed NTP time (s), the elapsed DS3231 time (s), the drift (s) and the aging correction,
+    i.e. 0.9 times the drift in ppm (factor preventing over-correction), rounded with a single division.
+    The aging correction is zero when the elapsed NTP time isn't positive.
+    """
+    elapsed_ntp_s = ntp_epoch_s - last_ntp_epoch_s
+    elapsed_ds3231_s = ds3231_epoch_s - last_ntp_epoch_s
+    drift_s = elapsed_ds3231_s - elapsed_ntp_s
+    aging_delta = (9_000_000 * drift_s + 5 * elapsed_ntp_s) // (10 * elapsed_ntp_s) if elapsed_ntp_s > 0 else 0
+    return elapsed_ntp_s, elapsed_ds3231_s, drift_s, aging_delta
+
 
 class SelfLearningClock:
     def __init__(self, logo_time_ms):
@@ -76,8 +132,11 @@ class SelfLearningClock:
         # lower ESP32-S3 frequency to reduce power consumption (80MHz is the minimum for wlan operation)
         freq = 80_000_000
         
-        # check / make a folder for the log related files
-        self._make_folder("log")
+        # make a folder for the log related files (a single mkdir, OSError when it already exists)
+        try:
+            mkdir("log")
+        except OSError:
+            pass
         
         # initialize the ntp_sync_pin imput pin to start a NTP Sync
         self.ntp_sync_pin = Pin(NTP_SYNC_PIN, Pin.IN, Pin.PULL_DOWN)
@@ -85,6 +144,17 @@ class SelfLearningClock:
         # enable the GPIO as a wake source from lightsleep
         wake_on_ext0(pin=self.ntp_sync_pin, level=WAKEUP_ANY_HIGH)
         
+        # GPIO interrupt waking the (not lightsleep) sleep, via a flag awaited by goto_sleep
+        self._wake_flag = asyncio.ThreadSafeFlag()
+        self.ntp_sync_pin.irq(trigger=Pin.IRQ_RISING, handler=lambda p: self._wake_flag.set())
+        
+        # esp32.NVS namespace, opened once and used by the NVS helpers
+        self._nvs = NVS(_NVS_NS)
+        
+        # values stored at esp32.NVS, cached at the first read or write (None when not known)
+        self._aging_cached = None
+        self._tz_cached = None        # tz_dst in integer minutes
+        
         # initialize the module for time management
         self.time_mgr = TimeManager(config)
         
@@ -106,11 +176,13 @@ class SelfLearningClock:
         
         # initialize the network manager module, by also passing the WDT manager
         self.network_mgr = NetworkManager(self.wdt_manager, try_open_networks=config.OPEN_NETWORKS)
+        
+        # bound method of the wdt feeding, snapshot once
+        self._feed_wdt = self.network_mgr.feed_wdt
 
         # check if error from initializing the network manager
         if not self.network_mgr.secrets:
-            self.display.text_on_logo("ERROR: SECRETS.JSON", x=-1, y=-1, show_time_ms=2_000)
-            sys.exit(1)
+            self._fatal("SECRETS")
             
         # initialize the battery manager module, if set at config file
         if config.BATTERY:
@@ -119,6 +191,10 @@ class SelfLearningClock:
         # initialize WDT after all components are initialized
         self.wdt_manager.initialize() 
         
+        # automatic gc collection once a quarter of the free heap (after the init) gets allocated
+        gc.collect()
+        gc.threshold(gc.mem_free() // 4 + gc.mem_alloc())
+        
         # initialize global variables: EPD refresh time is at least 60 secs (nominal)
         self.display_interval_ms = max(60_000, config.DISPLAY_REFRESH_MS)
 
@@ -128,6 +204,12 @@ class SelfLearningClock:
         self.enable_cal = False         # disables the self calibration until config.MIN_TIME_AUTO_CAL_H time has elapsed
         self.cycle_counter = 0          # more for fun than needed, it counts all the cycles (525600 cycles a year)
         self.display_update_count = 0   # counter to limit partial epd refreshes in between full refreshes
+        self._last_rendered_minute = -1 # minute last plotted on the display, to skip refreshes without changes
+        self._display_fail_count = 0    # consecutive display update failures (frames skipped)
+        
+        # battery warning framebuffer (composed at the first need) and ticks of its last plot
+        self._replace_batt_fb = None
+        self._last_replace_shown_ticks = None
         
         # unit variables
         self.degrees = config.TEMP_DEGREES
@@ -144,41 +226,50 @@ class SelfLearningClock:
     
     def get_reset_reason(self):
         """Checks the reason for the MCU boot"""
-        from machine import reset_cause, PWRON_RESET, HARD_RESET, WDT_RESET, DEEPSLEEP_RESET, SOFT_RESET
-        
-        reset_reason, reset_message = None, None
         reset_reason = reset_cause()
-        reset_message = {
-            PWRON_RESET: "POWER-ON RESET",
-            HARD_RESET: "HARD RESET",
-            WDT_RESET: "WATCHDOG RESET",
-            DEEPSLEEP_RESET: "DEEPSLEEP WAKE",
-            SOFT_RESET: "SOFT RESET"
-        }.get(reset_reason, f"???: {reset_reason}")
-        
-        del reset_cause, PWRON_RESET, HARD_RESET, WDT_RESET, DEEPSLEEP_RESET, SOFT_RESET
-        return reset_reason, reset_message
+        return reset_reason, _RESET_MSGS.get(reset_reason, "???: %d" % reset_reason)
+    
+    
+    
+    
+    def _show_error(self, key):
+        """Plots the OSC logo with the error message(s) of the _ERRORS table underneath."""
+        for text, show_time_ms in _ERRORS[key]:
+            self.display.text_on_logo(text, x=-1, y=-1, show_time_ms=show_time_ms)
     
     
     
     
-    def log_reset_reason(self, reset_reason, reset_msg):
-        """Writes the reset reason to a text file."""
+    def _fatal(self, key):
+        """Plots the error message(s) of the _ERRORS table and stops the program."""
+        self._show_error(key)
+        sys.exit(1)
+    
+    
+    
+    
+    async def log_reset_reason(self, reset_reason, reset_msg):
+        """Writes the reset reason to a text file, as a single line written at once."""
            
         # refresh the wdt
-        self.network_mgr.feed_wdt(label="write_rst_reason")
+        self._feed_wdt("write_rst_reason")
             
         try:
             datetime = await self.time_mgr.get_DS3231_time()
             
             # measure the battery voltage and related level 
-            batt_voltage, batt_level = self.battery.check_battery()
+            batt_voltage, batt_level = self.battery.check_battery() if config.BATTERY else (0, 0)
             
             if datetime is None:
                 datetime = ('time not known')
             
+            line = (f"Time: {datetime},  RST_reason: {reset_reason},  RST_msg: {reset_msg},  "
+                    f"Batt_volt: {round(batt_voltage, 3)}\n")
             with open(config.RESET_FILE_NAME, "a") as file:
-                file.write(f"Time: {datetime},  RST_reason: {str(reset_reason)},  RST_msg: {str(reset_msg)},  Batt_volt: {str(round(batt_voltage,3))}\n")
+                file.write(line)
+            
+            if config.DEBUG:
+                print(f"[DEBUG]    Reset logged: {line}", end="")
 
         except OSError as e:
             print(f"[ERROR]   Failed to write reset reason: {e}")
@@ -186,16 +277,28 @@ class SelfLearningClock:
     
     
     
-    def get_aging_nvs(self, key=1):
+    def get_aging_nvs(self):
         """Read aging factor from NVS"""
+        
+        # case the value is already known, NVS is not accessed
+        if self._aging_cached is not None:
+            return self._aging_cached
+        
         try:
-            nvs = NVS("storage")
+            nvs = self._nvs
             buffer = bytearray(8)
-            nvs.get_blob(str(key), buffer)
-            value = buffer.decode().strip('\x00') 
+            n = nvs.get_blob(_AGING_KEY, buffer)
+            
+            # case 1 byte blob (int8), otherwise text blob as stored by the previous versions
+            if n == 1:
+                value = unpack_from('b', buffer)[0]
+            else:
+                value = int(self._convert_to_number(buffer[:n].decode()))
+            
             if config.DEBUG:
                 print(f"[DEBUG]    An aging_factor was available: {value}")
-            return int(self._convert_to_number(value))
+            self._aging_cached = value
+            return value
         
         except Exception as e:
             if config.DEBUG:
@@ -208,12 +311,18 @@ class SelfLearningClock:
     
     
     
-    def save_aging_nvs(self, aging_factor, key=1):
+    def save_aging_nvs(self, aging_factor):
         """Save aging factor to NVS"""
+        
+        # case the value is already stored, the NVS commit (a flash write) is skipped
+        if aging_factor == self._aging_cached:
+            return True
+        
         try:
-            nvs = NVS("storage")
-            nvs.set_blob(str(key), str(aging_factor).encode())
+            nvs = self._nvs
+            nvs.set_blob(_AGING_KEY, pack('b', int(aging_factor)))
             nvs.commit()
+            self._aging_cached = aging_factor
             return True
         except Exception as e:
             if config.DEBUG:
@@ -223,16 +332,44 @@ class SelfLearningClock:
     
     
     
-    def get_tz_dst_nvs(self, text="DEBUG", key=2):
-        """Read tz_dst (Time Zone and DST correction) from NVS"""
+    def get_tz_dst_nvs(self, text="DEBUG"):
+        """Read tz_dst (Time Zone and DST correction) from NVS, in hours"""
+        tz_dst_min = self._get_tz_dst_min_nvs(text)
+        return tz_dst_min / 60 if tz_dst_min is not None else None
+    
+    
+    
+    
+    def get_tz_dst_s_nvs(self, text="DEBUG"):
+        """Read tz_dst (Time Zone and DST correction) from NVS, in integer seconds"""
+        tz_dst_min = self._get_tz_dst_min_nvs(text)
+        return tz_dst_min * 60 if tz_dst_min is not None else None
+    
+    
+    
+    
+    def _get_tz_dst_min_nvs(self, text):
+        """Read tz_dst (Time Zone and DST correction) from NVS, in integer minutes"""
+        
+        # case the value is already known, NVS is not accessed
+        if self._tz_cached is not None:
+            return self._tz_cached
+        
         try:
-            nvs = NVS("storage")
+            nvs = self._nvs
             buffer = bytearray(8)
-            nvs.get_blob(str(key), buffer)
-            value = buffer.decode().strip('\x00') 
+            n = nvs.get_blob(_TZ_KEY, buffer)
+            
+            # case 2 bytes blob (int16, minutes), otherwise text blob (hours) as stored by the previous versions
+            if n == 2:
+                value = unpack_from('h', buffer)[0]
+            else:
+                value = round(self._convert_to_number(buffer[:n].decode()) * 60)
+            
             if config.DEBUG:
-                print(f"[{text}]    A tz_dst (Time Zone and DST correction) was available, value: {value}")
-            return self._convert_to_number(value)
+                print(f"[{text}]    A tz_dst (Time Zone and DST correction) was available, value: {value / 60}")
+            self._tz_cached = value
+            return value
         
         except Exception as e:
             if config.DEBUG:
@@ -245,12 +382,22 @@ class SelfLearningClock:
     
     
     
-    def save_tz_dst_nvs(self, tz_dst, key=2):
+    def save_tz_dst_nvs(self, tz_dst):
         """Save tz_dst (Time Zone and DST correction) to NVS"""
+        
+        # tz_dst (hours) is stored in integer minutes
+        tz_dst_min = round(tz_dst * 60)
+        
+        # case the value is already stored, the NVS commit (a flash write) is skipped; before the first
+        # read or write since boot, the stored value is read (a fast NVS read) to fill the cache
+        if tz_dst_min == self._tz_cached or tz_dst_min == self._get_tz_dst_min_nvs("DEBUG"):
+            return
+        
         try:
-            nvs = NVS("storage")
-            nvs.set_blob(str(key), str(tz_dst).encode())
+            nvs = self._nvs
+            nvs.set_blob(_TZ_KEY, pack('h', tz_dst_min))
             nvs.commit()
+            self._tz_cached = tz_dst_min
         except Exception as e:
             if config.DEBUG:
                 print(f"[ERROR]   Issue on saving to esp32.NVS: {e}")
@@ -259,39 +406,58 @@ class SelfLearningClock:
     
     
     
-    def goto_sleep(self, total_sleep_ms):
+    async def goto_sleep(self, total_sleep_ms):
         """Function handling the needed steps to enter lightsleep"""
         
+        # local copy of the debug setting
+        debug = config.DEBUG
+        
         # refresh the wdt
-        self.network_mgr.feed_wdt(label="goto_sleep_1")
+        self._feed_wdt("goto_sleep_1")
 
+        # the pending wdt warnings are written to the log (RAM is lost at a reset or brown-out), and
+        # garbage collection when the free heap is low, their time taken from the sleep time
+        t_ref_ms = ticks_ms()
+        self.wdt_manager.flush()
+        if gc.mem_free() < config.GC_THRESHOLD:
+            gc.collect()
+        total_sleep_ms -= ticks_diff(ticks_ms(), t_ref_ms)
+        
         # ensures the sleep time being positive
         total_sleep_ms = max(0, total_sleep_ms)
         
         # case lightsleep is set False
         if not config.LIGHTSLEEP_USAGE:
             # The normal sleeping function is used, instead of the light sleep
-            # The sleep is done in chunk, to check the NTP button as per lighsleep
+            # The sleep awaits the NTP button interrupt, as per lighsleep, letting the scheduler idle
+            now_ms = ticks_ms()
  
-            if config.DEBUG:
-                print(f"[DEBUG]    MCU awake for {ticks_diff(ticks_ms(), self.t_out_sleep)} ms")
+            if debug:
+                print(f"[DEBUG]    MCU awake for {ticks_diff(now_ms, self.t_out_sleep)} ms")
                 print(f"[DEBUG]    Going to sleep for {total_sleep_ms} ms")
 
-            sleep_chunk_ms = 10
-            t_ref_ms = ticks_ms()
-            wake_triggered = False
-            while ticks_diff(ticks_ms(), t_ref_ms) < total_sleep_ms:
-                sleep_ms(sleep_chunk_ms)
-                if self.ntp_sync_pin.value():
-                    t_ref2_ms = ticks_ms()
-                    while self.ntp_sync_pin.value():
-                        if ticks_diff(ticks_ms(), t_ref2_ms) > 250:
-                            print("[DEBUG]    GPIO interrupt simulated — break sleep!")
-                            wake_triggered = True
-                            break
-                        sleep_ms(10)
-                if wake_triggered:
+            # deadline computed once, the loop ends at the deadline or when the pin is still active after the debounce
+            # no polling chunks: the task is only woken by the pin interrupt (or by the deadline), so the
+            # scheduler idles for the whole window and a back-off of the polling period isn't needed
+            deadline_ms = ticks_add(now_ms, total_sleep_ms)
+            remaining_ms = total_sleep_ms
+            
+            # an interrupt left over from a press already handled would end the first wait right away
+            self._wake_flag.clear()
+            while remaining_ms > 0 and not self.ntp_sync_pin.value():
+                
+                # wait for the GPIO interrupt, or for the sleep time to elapse
+                try:
+                    await asyncio.wait_for_ms(self._wake_flag.wait(), remaining_ms)
+                except asyncio.TimeoutError:
                     break
+                
+                # debounce of 250ms, before checking the pin again
+                await asyncio.sleep_ms(_DEBOUNCE_MS)
+                remaining_ms = ticks_diff(deadline_ms, ticks_ms())
+            
+            if debug and self.ntp_sync_pin.value():
+                print("[DEBUG]    GPIO interrupt — break sleep!")
         
         # case lightsleep is set True
         elif config.LIGHTSLEEP_USAGE:
@@ -305,15 +471,15 @@ class SelfLearningClock:
                     else:
                         total_sleep_ms = 0
             except Exception as e:
-                if config.DEBUG:
+                if debug:
                     print(f"[ERROR]   Issue at goto_sleep when config.LIGHTSLEEP_USAGE: {e}")
                 
             
             # refresh the wdt
-            self.network_mgr.feed_wdt(label="goto_sleep_2")
+            self._feed_wdt("goto_sleep_2")
             
 
-            if config.DEBUG:
+            if debug:
                 # MCU awake time (in ms)
                 print(f"[DEBUG]    MCU awake for {ticks_diff(ticks_ms(), self.t_out_sleep)} ms")
                 
@@ -337,11 +503,11 @@ class SelfLearningClock:
             #######################################################################
             #######################################################################
             
-            if config.DEBUG:
+            if debug:
                 print(f"[DEBUG]    Quitting lightsleep")
         
         # refresh the wdt
-        self.network_mgr.feed_wdt(label="goto_sleep_3")
+        self._feed_wdt("goto_sleep_3")
     
     
     
@@ -369,34 +535,31 @@ class SelfLearningClock:
         gc.collect()
         
         # refresh the wdt
-        self.network_mgr.feed_wdt(label="before making 1st wlan")
+        self._feed_wdt("before making 1st wlan")
         
         # initialize WiFi
-        self.network_mgr.connect_to_wifi(blocking=True)
+        await self.network_mgr.connect_to_wifi_async(blocking=True)
         
         # check if error due to wifi connection
         if not self.network_mgr.wifi_bool:
-            self.display.text_on_logo("ERROR: WIFI NETWORKS", x=-1, y=-1, show_time_ms=2_000)
-            sys.exit(1)
+            self._fatal("WIFI")
         
         # check if the wifi has internet connection
         ret = await self.network_mgr.is_internet_available(blocking=True)
         
         # check if error due to internet access
         if not ret:
-            self.display.text_on_logo("ERROR: NO INTERNET", x=-1, y=-1, show_time_ms=2_000)
-            sys.exit(1)
+            self._fatal("INET")
         
         # refresh the wdt
-        self.network_mgr.feed_wdt(label="after making 1st wlan")
+        self._feed_wdt("after making 1st wlan")
         
         # check the IP addresses of the NTP server(s)
         ntp_servers_ip = await self.network_mgr.get_ntp_servers_ip(repeats=5)
         
         # check if error ar resolving the NTP servers addresses
         if len(ntp_servers_ip) == 0:
-            self.display.text_on_logo("ERROR: NTP DNS", x=-1, y=-1, show_time_ms=0)
-            sys.exit(1)
+            self._fatal("DNS")
         
         # get the first tick, in ms (time from the board powering moment)
         tick = ticks_ms()
@@ -440,13 +603,24 @@ class SelfLearningClock:
             self.t_out_sleep = 0
         
         # main loop variables
-        last_halfour_check_ms = tick
-        last_hourly_check_ms = tick
         epd_refreshing_ms = 0
         sleep_time_ms = 0
         
+        # local bindings of the functions called at every loop
+        ticks_ms_l = ticks_ms
+        ticks_diff_l = ticks_diff
+        feed_wdt = self._feed_wdt
+        pin_value = self.ntp_sync_pin.value
+        
+        # local copy of the debug setting (it doesn't change at runtime)
+        debug = config.DEBUG
+        
         # instance counter for the period (hours) determining the calibration disabled / enabled
         self.hourly_counter = 0
+        
+        # due tick (ms) of the hourly check
+        # (the DS3231 temperature is read together with the time, at every display refresh)
+        next_hourly_ms = ticks_add(tick, _HOUR_MS)
 
 
 
@@ -463,107 +637,115 @@ class SelfLearningClock:
         
         while True:
 
-            # refresh the wdt
-            self.network_mgr.feed_wdt(label="Infinite loop start")
+            # refresh the wdt, once per loop (goto_sleep feeds it around the sleep)
+            feed_wdt("Infinite loop start")
             
             # tick (in ms) passed to most of the time-related funtions (all of those being time critical)
-            current_ticks_ms = ticks_ms()
+            current_ticks_ms = ticks_ms_l()
             
 
             # check if request for NTP sync (on-demand NTP sync, via an input pin)
-            if  self.ntp_sync_pin.value():
-                # time reference for contact debounce purpose
-                t_ref_ms = ticks_ms()
+            if  pin_value():
+                # contact debounce: the other tasks run meanwhile
+                await asyncio.sleep_ms(_DEBOUNCE_MS)
                 
-                # iterates as long as the pin is active
-                while self.ntp_sync_pin.value():
+                # case the pin is still active after 250 ms (debounce of 250ms)
+                if pin_value():
+                    print("\n"*3)
+                    if debug:
+                        print("[DEBUG]    ##############################################     on-demand NTP sync")
                     
-                    # case the pin is active for at least 250 ms (debounce of 250ms)
-                    if ticks_diff(ticks_ms(), t_ref_ms) > 250:
-                        print("\n"*3)
-                        if config.DEBUG:
-                            print("[DEBUG]    ##############################################     on-demand NTP sync")
-                        
-                        # call the supporting function
-                        await self._handle_ntp_sync(current_ticks_ms, ntp_servers_ip, ntp_epoch_s)
-                        
-                        # set the instance variable to force a display update
-                        self.forced_cycle = True
-                        
-                        # interrupts the while loop
-                        break
+                    # call the supporting function
+                    await self._handle_ntp_sync(current_ticks_ms, ntp_servers_ip, ntp_epoch_s)
+                    
+                    # set the instance variable to force a display update
+                    self.forced_cycle = True
             
             
-            # half-hour checks
-            if ticks_diff(current_ticks_ms, last_halfour_check_ms) > 1_800_000:
-                
-                # assign the current ticks to the quarter check time
-                last_halfour_check_ms = current_ticks_ms
-                
-                # refresh the wdt    
-                self.network_mgr.feed_wdt(label="Half-hour checks")
-                
-                # call the supporting function to get the time from DS3231
-                self.ds3231_temp = await self._get_DS3231_temperature()
-                
-               
-                # hourly checks
-                if ticks_diff(current_ticks_ms, last_hourly_check_ms) > 3_600_000:
-                    
-                    # increase the hourly counter by one
-                    self.hourly_counter += 1
-                    
-                    # assign the current ticks to the hourly check time
-                    last_hourly_check_ms = current_ticks_ms
-                    
-                    # refresh the wdt
-                    self.network_mgr.feed_wdt(label="Hourly checks")
-                    
-                    # case the battery is set True
-                    if config.BATTERY:
-                        # measure the battery voltage and related level 
-                        batt_voltage, batt_level = self.battery.check_battery()
-                        
-                        # case the current battery values differ from the previous ones
-                        if batt_voltage != self.batt_voltage or batt_level != self.batt_level:
-                            self.batt_voltage = batt_voltage
-                            self.batt_level = batt_level
-                    
-                    # check if calibration can be enabled
-                    if self.hourly_counter >= config.MIN_TIME_AUTO_CAL_H:
-                        
-                        # enables the option for self-calibration the DS3231 by forcing a NTP sunc
-                        self.enable_cal = True
-                        
-                        # decrease the hourly counter by one when surely above config.MIN_TIME_AUTO_CAL_H
-                        if self.hourly_counter >= 2 + config.MIN_TIME_AUTO_CAL_H:
-                            self.hourly_counter -= 1
-                        
-                    
+            # hourly check, run when its due tick has passed
+            if ticks_diff_l(current_ticks_ms, next_hourly_ms) >= 0:
+                next_hourly_ms = ticks_add(current_ticks_ms, _HOUR_MS)
+                await self._hourly_check()
+            
             
             # case it is time for display refresh
-            if self.forced_cycle or ticks_diff(current_ticks_ms, self.last_display_update_ticks) >= self.display_interval_ms:
+            if self.forced_cycle or ticks_diff_l(current_ticks_ms, self.last_display_update_ticks) >= self.display_interval_ms:
                 
                 self.last_display_update_ticks = current_ticks_ms
                 
-                # call the supporting function to get the time from DS3231
-                self.time_tuple = await self._get_DS3231_time()
-
-                # calls the support function to update the display
-                epd_refreshing_ms = await self._display_update(current_ticks_ms)
+                # call the supporting function to get the time, and the temperature, from DS3231
+                self.time_tuple, ds3231_temp = await self._get_DS3231_time_temperature()
+                if ds3231_temp is not None:
+                    self.ds3231_temp = ds3231_temp
+                minute = self.time_tuple[4] if self.time_tuple is not None else -1
+                
+                # case the minute to plot is the one already on the display (refreshed too early)
+                if not self.forced_cycle and minute == self._last_rendered_minute and minute != -1:
+                    # the display refresh is skipped, the sleep time gets adapted anyhow
+                    epd_refreshing_ms = 0
+                    if debug:
+                        print(f"[DEBUG]    Minute {minute} already on display, refresh skipped")
+                
+                else:
+                    # calls the support function to update the display
+                    epd_refreshing_ms = await self._display_update(current_ticks_ms)
+                    
+                    # the minute is marked as rendered only when the display update succeeded
+                    if not self._display_fail_count:
+                        self._last_rendered_minute = minute
                 
                 # eventually adapts the sleep time to get the display synchronized with minute change
                 sleep_time_ms = self._epd_sync(current_ticks_ms, epd_refreshing_ms, sleep_time_ms )
                 
                 # call the supporting function for sleep or lighsleep
-                self.goto_sleep(sleep_time_ms)
+                await self.goto_sleep(sleep_time_ms)
                 
                 # get the tick (in ms) right after waking up
-                if config.DEBUG:
-                    self.t_out_sleep = ticks_ms()
+                if debug:
+                    self.t_out_sleep = ticks_ms_l()
                 
                 # increases the cycle counter
                 self.cycle_counter += 1
+            
+            # case no display refresh (woken before it is due, or by a too short button press)
+            else:
+                # sleeps until the display refresh, or the hourly check, is due
+                now_ms = ticks_ms_l()
+                wait_ms = min(ticks_diff_l(ticks_add(self.last_display_update_ticks, self.display_interval_ms), now_ms),
+                              ticks_diff_l(next_hourly_ms, now_ms))
+                if wait_ms > 0:
+                    await self.goto_sleep(wait_ms)
+                    if debug:
+                        self.t_out_sleep = ticks_ms_l()
+    
+    
+    
+    
+    async def _hourly_check(self):
+        """Periodic check, every hour: battery and enabling of the self calibration."""
+        
+        # increase the hourly counter by one
+        self.hourly_counter += 1
+        
+        # case the battery is set True
+        if config.BATTERY:
+            # measure the battery voltage and related level 
+            batt_voltage, batt_level = self.battery.check_battery()
+            
+            # case the current battery values differ from the previous ones
+            if batt_voltage != self.batt_voltage or batt_level != self.batt_level:
+                self.batt_voltage = batt_voltage
+                self.batt_level = batt_level
+        
+        # check if calibration can be enabled
+        if self.hourly_counter >= config.MIN_TIME_AUTO_CAL_H:
+            
+            # enables the option for self-calibration the DS3231 by forcing a NTP sunc
+            self.enable_cal = True
+            
+            # decrease the hourly counter by one when surely above config.MIN_TIME_AUTO_CAL_H
+            if self.hourly_counter >= 2 + config.MIN_TIME_AUTO_CAL_H:
+                self.hourly_counter -= 1
     
     
     
@@ -574,11 +756,8 @@ class SelfLearningClock:
         It automatically adjusts 
         """
         
-        # force garbage collection
-        gc.collect()
-        
         # refresh the wdt
-        self.network_mgr.feed_wdt(label="Start of NTP IP refresh")
+        self._feed_wdt("Start of NTP IP refresh")
         
         # plot the OSC logo with a custom text underneath
         self.display.text_on_logo("GET SERVERS IP ...", x=-1, y=-1, show_time_ms=500)
@@ -590,18 +769,14 @@ class SelfLearningClock:
         ntp_servers_ip, _ = await self.network_mgr.refresh_ntp_ip(current_ticks_ms, ntp_servers_ip, blocking=False)
         
         if ntp_servers_ip is None:
-            # plot the OSC logo with a custom text underneath
-            self.display.text_on_logo("NTP  SYNC  FAILED ...", x=-1, y=-1, show_time_ms=5_000)
-            self.display.text_on_logo("CHECK WIFI NETWORKS", x=-1, y=-1, show_time_ms=5_000)
+            # plot the OSC logo with the error text underneath
+            self._show_error("NTP")
             
             # the function gets interrupted
             return
-            
-        # force garbage collection
-        gc.collect()
         
         # refresh the wdt
-        self.network_mgr.feed_wdt(label="Start of synchronizing the display")
+        self._feed_wdt("Start of synchronizing the display")
     
         # plot the OSC logo with a custom text underneath
         self.display.text_on_logo("NTP  SYNCING ...", x=-1, y=-1, show_time_ms=500)
@@ -611,16 +786,12 @@ class SelfLearningClock:
         
         # case the NTP sync fails
         if ntp_epoch_s is None or epoch_fract_ms is None or sync_ticks_ms is None:
-            # plot the OSC logo with a custom text underneath
-            self.display.text_on_logo("NTP  SYNC  FAILED ...", x=-1, y=-1, show_time_ms=5_000)
-            self.display.text_on_logo("CHECK WIFI NETWORKS", x=-1, y=-1, show_time_ms=5_000)
+            # plot the OSC logo with the error text underneath
+            self._show_error("NTP")
             
             # the function gets interrupted
             return
         
-        # force garbage collection
-        gc.collect()
-        
         # set the ntp_epoch_s to the ds3231 rtc module
         await self._set_DS3231_rtc(ntp_epoch_s, epoch_fract_ms, sync_ticks_ms)
         
@@ -635,9 +806,6 @@ class SelfLearningClock:
         # call the aging calibration function
         self.aging = await self._calibrate(ntp_epoch_s, epoch_fract_ms, sync_ticks_ms, time_tuple)
         
-        # force garbage collection
-        gc.collect()
-        
         # assign ntp_epoch_s to self.last_ntp_epoch_s for later calibration purpose
         self.last_ntp_epoch_s = ntp_epoch_s
 
@@ -659,7 +827,10 @@ class SelfLearningClock:
           resets the DS3231 aging factor to zero.
         """
         
-        if config.DEBUG:
+        # local copy of the debug setting
+        debug = config.DEBUG
+        
+        if debug:
             print()
             
         # aging is initially set to None
@@ -672,30 +843,24 @@ class SelfLearningClock:
         reset_aging = False
         
         # get the TZ and DST correction to NVS
-        utc_tz_dst = self.get_tz_dst_nvs(text = "CALIB")
+        tz_dst_s = self.get_tz_dst_s_nvs(text = "CALIB")
         
         # check NTP sync result
-        if ntp_epoch_s is not None and time_tuple is not None and utc_tz_dst is not None:
+        if ntp_epoch_s is not None and time_tuple is not None and tz_dst_s is not None:
             
-            # elapsed time (in s) according to the latest two NTP syncs
-            elapsed_ntp_time_s = ntp_epoch_s - self.last_ntp_epoch_s
-
-            # elapsed time (in s) according to the DS3231SN RTC timer
-            elapsed_ds3231_time_s = mktime(time_tuple) - int(utc_tz_dst * 3_600) - self.last_ntp_epoch_s
-            
-            # drift time (in s) of DS3231SN RTC timer vs NTP sysnc
-            drift_ds3231_s = elapsed_ds3231_time_s - elapsed_ntp_time_s
+            # elapsed times (in s) since the last NTP sync, according to NTP and to the DS3231SN RTC timer,
+            # drift time (in s) of DS3231SN RTC timer vs NTP sysnc, and the related aging correction
+            elapsed_ntp_time_s, elapsed_ds3231_time_s, drift_ds3231_s, aging_delta = _calc_drift(
+                ntp_epoch_s, self.last_ntp_epoch_s, mktime(time_tuple) - tz_dst_s)
             
             # preventing division by zero (and unrealistic negative time)
             if elapsed_ntp_time_s <= 0:
-                if config.DEBUG:
+                if debug:
                     print("[ERROR]    Elapsed time based on NTP sync is zero, how come ?")
                 return
             
-            # drift time (in pp) of DS3231SN RTC timer vs NTP sysnc
-            drift_ds3231_ppm = 1_000_000 * drift_ds3231_s / elapsed_ntp_time_s
-            
-            if config.DEBUG:
+            if debug:
+                drift_ds3231_ppm = 1_000_000 * drift_ds3231_s / elapsed_ntp_time_s
                 print(f"[CALIB]    Elapsed time based on NTP sync : {elapsed_ntp_time_s} s")
                 print(f"[CALIB]    Elapsed time based on DS3231   : {elapsed_ds3231_time_s} s")
                 print(f"[CALIB]    DS3231 drift  : {drift_ds3231_s} s")
@@ -704,10 +869,11 @@ class SelfLearningClock:
             # case the calibration is enabled
             if self.enable_cal:
                 # shift the aging by the drift in ppm (sign of drift is already ok).
-                # Every units should compensate 1ppm, using a factor 0.9 to prevent over-correction
-                new_aging = int(round(min(127, max(-127, self.aging + 0.9 * drift_ds3231_ppm)),0))
+                # Every units should compensate 1ppm, using a factor 0.9 (rounded, integer math) to prevent over-correction
+                na = self.aging + aging_delta
+                new_aging = 127 if na > 127 else (-127 if na < -127 else na)
                 
-                if config.DEBUG:
+                if debug:
                     print(f"[CALIB]    New aging factor: {new_aging}")
                 
                 # set 3 attempts for aging factor calibration
@@ -719,6 +885,10 @@ class SelfLearningClock:
                 attempts = 1
             
              
+            # local bindings of the methods called within the attempts
+            pin_value = self.ntp_sync_pin.value
+            text_on_logo = self.display.text_on_logo
+            
             # iteration over the attempts
             for attempt in range(attempts):
                 
@@ -730,54 +900,57 @@ class SelfLearningClock:
                 delay_ms = ticks_diff(ticks_ms(), sync_ticks_ms)
                 
                 # check if the push button is still pressed
-                if self.ntp_sync_pin.value() and not done:
+                if pin_value() and not done:
                     
                     # case self calibration is enabled (config.MIN_TIME_AUTO_CAL_H time has elapsed)
                     if self.enable_cal:
-                        self.display.text_on_logo("RELEASE FOR CALIB,", x=-1, y=-1, show_time_ms=300)
-                        if not self.ntp_sync_pin.value():
+                        text_on_logo("RELEASE FOR CALIB,", x=-1, y=-1, show_time_ms=300)
+                        if not pin_value():
                             break
                     
-                    self.display.text_on_logo("KEEP FOR RESET", x=-1, y=-1, show_time_ms=300)
-                    if not self.ntp_sync_pin.value():
+                    text_on_logo("KEEP FOR RESET", x=-1, y=-1, show_time_ms=300)
+                    if not pin_value():
                         break
                 
-                # delay to ensure the button signal is still intentionally high or it has dropped down
-                sleep_ms(500)
+                # window (500 ms) to ensure the button signal is still intentionally high or it has dropped down:
+                # the pin is sampled every 20 ms, and a stable release (4 low samples) ends the window earlier
+                low_samples = 0
+                for _ in range(25):
+                    await asyncio.sleep_ms(20)
+                    low_samples = 0 if pin_value() else low_samples + 1
+                    if low_samples >= 4:
+                        break
                 
                 # evaluate the button signal again
                 # case the button is still pressed
-                if self.ntp_sync_pin.value():
-                    # reset the DS3231 chip to aging factor = 0
-                    ret = await self.time_mgr.write_DS3231_aging(value = 0)
-                    reset_aging = True
-                    if config.DEBUG:
+                if pin_value():
+                    if debug:
                         print("[CALIB]    Going to reset the aging factor")
-                
-                # case the button has been released
-                elif not self.ntp_sync_pin.value():
-                    # set the ret variable False, in case write_DS3231_aging is not executed 
-                    ret = False
                     
-                    # case self calibration is enabled (config.MIN_TIME_AUTO_CAL_H time has elapsed)
-                    if self.enable_cal:
-                        
-                        # write the new aging factor to the DS3231 chip
-                        ret = await self.time_mgr.write_DS3231_aging(value = new_aging)
-                        reset_aging = False
-                        if config.DEBUG:
-                            print("[CALIB]    Going to modify the aging factor")
-                
-                # small delay to ensure DS3231 writing is completed
-                sleep_ms(250)
+                    # reset the DS3231 chip to aging factor = 0, and read it back once applied
+                    aging_ds3231 = await self.time_mgr.commit_and_verify_aging(0)
+                    ret = aging_ds3231 is not None
+                    reset_aging = True
                 
-                # read the aging factor from the DS3231 chip
-                aging_ds3231 = await self.time_mgr.read_DS3231_aging()
+                # case the button has been released and self calibration is enabled
+                elif self.enable_cal:
+                    if debug:
+                        print("[CALIB]    Going to modify the aging factor")
+                    
+                    # write the new aging factor to the DS3231 chip, and read it back once applied
+                    aging_ds3231 = await self.time_mgr.commit_and_verify_aging(new_aging)
+                    ret = aging_ds3231 is not None
+                    reset_aging = False
                 
-                # small delay after DS3231 reading
-                sleep_ms(250)
+                # case the button has been released and self calibration is disabled
+                else:
+                    # set the ret variable False, as the aging factor is not written
+                    ret = False
+                    
+                    # read the aging factor from the DS3231 chip
+                    aging_ds3231 = await self.time_mgr.read_DS3231_aging()
                 
-                if config.DEBUG:
+                if debug:
                     if ret:
                         print("[CALIB]    Writing to DS3231 without errors")
                     print(f"[CALIB]    Retrieved aging value from DS3231: {aging_ds3231}")
@@ -791,11 +964,11 @@ class SelfLearningClock:
                         # the reset  aging value at the DS3131 is assigned to the variable aging
                         aging = 0
                         
-                        if config.DEBUG:
+                        if debug:
                             print("[CALIB]    Aging factor reset to zero at DS3231 chip")
                         
                         # plot the OSC logo with a custom text underneath
-                        self.display.text_on_logo("RESET CALIBRATION", x=-1, y=-1, show_time_ms=5_000)
+                        text_on_logo("RESET CALIBRATION", x=-1, y=-1, show_time_ms=5_000)
                         
                         # set the done variable to False to interrupt the for loops
                         done = True # for loop is interrupted
@@ -807,11 +980,11 @@ class SelfLearningClock:
                         # the just saved aging value at the DS3131 is assigned to the variable aging
                         aging = aging_ds3231
                     
-                        if config.DEBUG:
+                        if debug:
                             print("[CALIB]    New aging factor has been written to the DS3231 chip")
                         
                         # plot the OSC logo with a custom text underneath
-                        self.display.text_on_logo(" CALIBRATED  CLOCK", x=-1, y=-1, show_time_ms=5_000)
+                        text_on_logo(" CALIBRATED  CLOCK", x=-1, y=-1, show_time_ms=5_000)
                         
                         # set the done variable to False to interrupt the for loops
                         done = True # for loop is interrupted
@@ -823,7 +996,7 @@ class SelfLearningClock:
                 if done:
                     break  # for loop is interrupted
         
-        if config.DEBUG:
+        if debug:
             print()
         
         if self.enable_cal:
@@ -837,34 +1010,42 @@ class SelfLearningClock:
     async def _display_update(self, current_ticks_ms):
         """Support function handling display update"""
         
+        # local copy of the debug setting
+        debug = config.DEBUG
+        
         t_edp_ref_ms = ticks_ms()
         
-        if config.DEBUG:
+        # local copies of the attributes used more than once
+        time_tuple = self.time_tuple
+        time_mgr = self.time_mgr
+        network_mgr = self.network_mgr
+        
+        # the forced_cycle flag is read once, and cleared before the display update
+        forced_cycle = self.forced_cycle
+        self.forced_cycle = False
+        
+        if debug:
             print(f"{'\n'*3}[DEBUG]    {'#'*46}     cycle_counter: {self.cycle_counter}")
-            if not self.forced_cycle:
+            if not forced_cycle:
                 print(f"[DEBUG]    From quitting sleep (or lightleep) and ticking",
-                      f"display_interval_ms: {ticks_diff(ticks_ms(), self.t_out_sleep)} ms")
-
-        if self.forced_cycle:
-            self.forced_cycle = False
+                      f"display_interval_ms: {ticks_diff(t_edp_ref_ms, self.t_out_sleep)} ms")
         
         try:
             
-            # case self.time_tuple is not None
-            if self.time_tuple is not None:
+            # case time_tuple is not None
+            if time_tuple is not None:
                 # retrieve the single digits for hour and minute
-                H1, H2, M1, M2, am = self.time_mgr.get_time_digits(self.time_tuple)
+                H1, H2, M1, M2, am = time_mgr.get_time_digits(time_tuple)
                 
                 # retrieve the date fields
-                dd, day, d_string = self.time_mgr.get_date(self.time_tuple)
+                dd, day, d_string = time_mgr.get_date(time_tuple)
+                minute = time_tuple[4]
             
-            # case self.time_tuple is None
+            # case time_tuple is None
             else:
-                H1, H2, M1, M2, am =  0, 0, 0, 0, True
-                dd, day, d_string = 1, 0, "  -  -  "
-            
-            # forced garbage collection
-            gc.collect()
+                H1, H2, M1, M2, am = _NULL_TIME
+                dd, day, d_string = _NULL_DATE
+                minute = 10 * M1 + M2
             
             # set the battery_low flag as False
             battery_low = False
@@ -875,30 +1056,36 @@ class SelfLearningClock:
                 battery_low = True
             
             # determines how to refresh the display (full or partial update)
-            if self.time_tuple[4] == 0:  # case minutes = 0 (round hour)
+            if minute == 0:              # case minutes = 0 (round hour)
                 epd_clear = True         # display full refresh (prevent ghosting)
             else:                        # case minutes != 0 (minutes 1 to 59)
                 epd_clear = False        # display partial update (saves energy)
             
             # send the updated info to the display Class
             self.display.show_data(H1, H2, M1, M2, dd, day, d_string, self.ntp_datetime_str,
-                                   self.ds3231_temp, self.batt_level, self.network_mgr.wifi_bool,
-                                   self.network_mgr.ntp_bool, self.aging, self.enable_cal,
+                                   self.ds3231_temp, self.batt_level, network_mgr.wifi_bool,
+                                   network_mgr.ntp_bool, self.aging, self.enable_cal,
                                    battery_low=battery_low, plot_all=epd_clear)
             
             # refresh the wdt
-            self.network_mgr.feed_wdt(label="update_display_2")
+            self._feed_wdt("update_display_2")
 
         except Exception as e:
             print(f"[ERROR]   Display error: {e}")
-            raise
+            
+            # a display fault skips this frame, the next refresh tries again
+            self._display_fail_count += 1
+            return 0
+        
+        self._display_fail_count = 0
 
         # print interpreted time and drift
-        if config.DEBUG:
-            print(f"[DEBUG]    Time from DS3231 module {self.time_tuple}, DS3231_Temp: {self.ds3231_temp:.2f}°{self.degrees}")
+        if debug:
+            print(f"[DEBUG]    Time from DS3231 module {time_tuple}, DS3231_Temp: {self.ds3231_temp:.2f}°{self.degrees}")
         else:
-            print(f"[INFO]     Display: {self.time_tuple[3]}:{self.time_tuple[4]} \t"
-                  f"DS3231_Temp: {self.ds3231_temp:.2f}°{self.degrees} \tBattery: {self.batt_level} %")
+            # positional print arguments, the line is not built as a single string
+            print("[INFO]     Display: ", time_tuple[3], ":", time_tuple[4], " \tDS3231_Temp: ",
+                  "%.2f" % self.ds3231_temp, "°", self.degrees, " \tBattery: ", self.batt_level, " %", sep="")
         
         self.last_display_update_ticks = current_ticks_ms
         self.display_update_count += 1
@@ -909,6 +1096,7 @@ class SelfLearningClock:
     
     
     
+    @micropython.native
     def _epd_sync(self, current_ticks_ms, epd_refreshing_ms, sleep_time_ms):
         """
         Synchronizing the display refreshing moment right after a minute change.
@@ -929,41 +1117,42 @@ class SelfLearningClock:
         Note: the shift_ms acts on both the display time reference and the sleeping time
         """
         
-        target_ms = 4_000             # target 4000 ms means 4 secs after the minute change
-        shift_ms = target_ms - 2_000  # when target 4000 ms the applied correction (shift_ms) is 2 secs
+        target_ms = _EPD_TARGET_MS    # target 4000 ms means 4 secs after the minute change
+        shift_ms = _EPD_SHIFT_MS      # when target 4000 ms the applied correction (shift_ms) is 2 secs
+        
+        # local copies of the attributes used more than once
+        interval_ms = self.display_interval_ms
+        time_tuple = self.time_tuple
+        
+        # case the time is not known (failed DS3231 read): no adjustment, the next refresh is due after interval_ms
+        if time_tuple is None:
+            return interval_ms
+        
+        seconds = time_tuple[5]
         
         # calculate the remainder (i.e. exceeding milliseconds from minute change)
-        remainder_ms = (self.time_tuple[5] * 1_000) % self.display_interval_ms
+        remainder_ms = (seconds * 1_000) % interval_ms
         
-        # case remainder_ms <= target_ms, it means the display refreshed too early: Need longer sleep_time_ms 
-        if remainder_ms <= target_ms:  
-            
-            # last_display_update_ticks (time when display got updated last time) last gets postponed
-            self.last_display_update_ticks += (shift_ms - remainder_ms)
-            
-            # calculate the cycle time, necessary for precise calculation of the lighsleep time
-            cycle_time_ms = ticks_diff(ticks_ms(), current_ticks_ms)
-            
-            # sleep time adjustment (sleep as long as possible, yet in time for next display refresh)
-            sleep_time_ms = self.display_interval_ms - cycle_time_ms - remainder_ms + shift_ms
-            
-            if config.DEBUG:
-                if shift_ms - remainder_ms == 0:
-                    print(f"[DEBUG]    Display refreshed at seconds {self.time_tuple[5]} --> OK ")
-                else:
-                    print(f"[DEBUG]    Display refreshed at seconds {self.time_tuple[5]} --> OK "   
-                          f"(tuning sleep: {remainder_ms + shift_ms} and last_display_update_ticks: {shift_ms - remainder_ms})")
+        # case remainder_ms <= target_ms, it means the display refreshed too early: Need longer sleep_time_ms,
+        # and last_display_update_ticks (time when display got updated last time) gets postponed.
+        # Otherwise the display refreshed too late: Need shorter sleep_time_ms, and last_display_update_ticks
+        # gets anticipated
+        early = remainder_ms <= target_ms
+        deviation_ms = shift_ms - remainder_ms
+        self.last_display_update_ticks += deviation_ms if early else sleep_time_ms - interval_ms
         
-        # case remainder_ms >= target_ms, it means display refreshed too late: Need shorter sleep_time_ms
-        else:
-            
-            # last_display_update_ticks (time when display got updated last time) last gets anticipate
-            self.last_display_update_ticks -= (self.display_interval_ms - sleep_time_ms)
-            
-            # sleep time adjustment (sleep as long as possible, yet in time for next display refresh)
-            sleep_time_ms = self.display_interval_ms - epd_refreshing_ms - remainder_ms + shift_ms
-            if config.DEBUG:
-                print(f"[DEBUG]    Display refreshed at seconds {self.time_tuple[5]} --> adapting the sleeping time")
+        # sleep time adjustment (sleep as long as possible, yet in time for next display refresh), based on
+        # the cycle time when too early (necessary for precise calculation of the lighsleep time)
+        sleep_time_ms = interval_ms - (ticks_diff(ticks_ms(), current_ticks_ms) if early else epd_refreshing_ms) + deviation_ms
+        
+        if config.DEBUG:
+            if not early:
+                print(f"[DEBUG]    Display refreshed at seconds {seconds} --> adapting the sleeping time")
+            elif deviation_ms == 0:
+                print(f"[DEBUG]    Display refreshed at seconds {seconds} --> OK ")
+            else:
+                print(f"[DEBUG]    Display refreshed at seconds {seconds} --> OK "   
+                      f"(tuning sleep: {remainder_ms + shift_ms} and last_display_update_ticks: {deviation_ms})")
         
         return sleep_time_ms
     
@@ -976,21 +1165,19 @@ class SelfLearningClock:
         Write to NVS the TZ and DST correction applied to the rtc
         """
         
-        if config.DEBUG:
-            t_ref_ms = ticks_ms()
-        
-        ret = False
-        
-
         # compensation for code delay, in case exceeding 0.5 seconds
         delay_ms = epoch_fract_ms + ticks_diff(ticks_ms(), sync_ticks_ms)
         delay_s = int(round(delay_ms / 1_000, 0))
         
         # sets the time to the ds3231 module
-        ret = await self.time_mgr.update_rtc(ntp_epoch_s + delay_s)
+        set_epoch_s = ntp_epoch_s + delay_s
+        ret = await self._i2c_retry(lambda pwr_up_time_ms=5: self.time_mgr.update_rtc(set_epoch_s, pwr_up_time_ms),
+                                    "set RTC")
         
-        # check the time has been correctly saved to the DS3231SN RTC
-        time_tuple = await self._get_DS3231_time()
+        # check the time has been correctly saved to the DS3231SN RTC: the read runs as a task, and the
+        # yield lets it power up the DS3231, so the NVS write below overlaps with the power-up wait
+        time_task = asyncio.create_task(self._get_DS3231_time())
+        await asyncio.sleep_ms(0)
         
         # retrieve the TZ and DST correction applied when saving the epoch_s to DS3231 RTC
         utc_tz_dst = self.time_mgr.get_UTC_TZ(ntp_epoch_s)   # utc_tz_dst units is hours
@@ -1003,92 +1190,82 @@ class SelfLearningClock:
 
         # save the TZ and DST correction to NVS
         self.save_tz_dst_nvs(utc_tz_dst)
-
-        # check the DS3231 return
-        if ret:
+        
+        # time read back from the DS3231SN RTC, converted to UTC epoch_s: it has to match the set time (+/- 1 s)
+        time_tuple = await time_task
+        if time_tuple is None or abs(mktime(time_tuple) - round(3600 * utc_tz_dst) - set_epoch_s) > 1:
             if config.DEBUG:
-                print(f"[DEBUG]    Set RTC to DS3231 module in {ticks_diff(ticks_ms(), t_ref_ms)} ms")
-            return ret
+                print(f"[ERROR]   DS3231 time read back {time_tuple} doesn't match the set time")
+            ret = False
         
-        else:
-            for i in range(5):
-                ret = await self.time_mgr.update_rtc(ntp_epoch_s + delay_s, pwr_up_time_ms = (i+1)*10)
-                if ret:
-                    if config.DEBUG:
-                        print("[DEBUG]    Set RTC to DS3231 module at attempt {i+2] out 5")
-                    return ret
-                
-                if not ret:
-                    # plot the OSC logo with a custom text underneath
-                    self.display.text_on_logo("REPLACE  ML2032  BATT.", x=10, y=-1, show_time_ms=60000)
-                    return ret
+        return ret
     
     
     
     
     async def _get_DS3231_time(self):
-        if config.DEBUG:
-            t_ref_ms = ticks_ms()
-        
-        ret = None
-        
         # retrieves the time from the ds3231 module
-        ret = await self.time_mgr.get_DS3231_time()
-        
-        # check the DS3231 return
-        if ret is not None:
-            if config.DEBUG:
-                print(f"[DEBUG]    DS3231 module returned time in {ticks_diff(ticks_ms(), t_ref_ms)} ms")
-            return ret
-        
-        else:
-            for i in range(5):
-                ret = await self.time_mgr.get_DS3231_time(pwr_up_time_ms = (i+1)*10)
-                if ret is not None:
-                    if config.DEBUG:
-                        print("[DEBUG]    DS3231 module replied at attempt {i+2] out 5")
-                    return ret
-                
-                elif ret is None:
-                    # plot the OSC logo with a custom text underneath
-                    self.display.text_on_logo("REPLACE  ML2032  BATT.", x=10, y=-1, show_time_ms=60000)
-                    return ret
+        return await self._i2c_retry(self.time_mgr.get_DS3231_time, "returned time")
     
     
     
     
     async def _get_DS3231_temperature(self):
-        if config.DEBUG:
-            t_ref_ms = ticks_ms()
+        # retrieves the temperature from the ds3231 module
+        ret = await self._i2c_retry(self.time_mgr.get_DS3231_temperature, "returned temperature")
+        return ret + config.TEMPERATURE_SHIFT if ret is not None else None
+    
+    
+    
+    
+    async def _get_DS3231_time_temperature(self):
+        # retrieves the time and the temperature from the ds3231 module, with a single I2C transaction
+        ret = await self._i2c_retry(self.time_mgr.get_DS3231_time_temperature, "returned time and temperature")
+        if ret is None:
+            return None, None
+        return ret[0], ret[1] + config.TEMPERATURE_SHIFT
+    
+    
+    
+    
+    async def _i2c_retry(self, fn, label):
+        """
+        Calls the DS3231 coroutine function fn; in case of failure (None or False returned) it retries
+        5 times, with increasing power-up time of the module, before plotting the battery warning.
+        """
         
-        ret = None
+        # local copy of the debug setting
+        debug = config.DEBUG
         
-        # retrieves the temperature from the ds3231 module
-        ret = await self.time_mgr.get_DS3231_temperature()
+        if debug:
+            t_ref_ms = ticks_ms()
         
-        # check the DS3231 return
-        if ret is not None:
-            if config.DEBUG:
-                print(f"[DEBUG]    DS3231 module returned temperature in {ticks_diff(ticks_ms(), t_ref_ms)} ms")
-            return ret + config.TEMPERATURE_SHIFT
+        ret = await fn()
+        if ret is not None and ret is not False:
+            if debug:
+                print(f"[DEBUG]    DS3231 module {label} in {ticks_diff(ticks_ms(), t_ref_ms)} ms")
+            return ret
         
-        else:
-            for i in range(5):
-                ret = await self.time_mgr.get_DS3231_temperature(pwr_up_time_ms = (i+1)*10)
-                if ret is not None:
-                    if config.DEBUG:
-                        print("[DEBUG]    DS3231 module replied at attempt {i+2] out 5")
-                    return ret + config.TEMPERATURE_SHIFT
-                
-                elif ret is None:
-                    # plot the OSC logo with a custom text underneath
-                    self.display.text_on_logo("REPLACE  ML2032  BATT.", x=10, y=-1, show_time_ms=60000)
-                    return ret + config.TEMPERATURE_SHIFT
+        for i in range(5):
+            ret = await fn(pwr_up_time_ms = (i+1)*10)
+            if ret is not None and ret is not False:
+                if debug:
+                    print(f"[DEBUG]    DS3231 module {label} at attempt {i+2} out of 6")
+                return ret
+        
+        # plot the OSC logo with the battery warning, at most once every _REPLACE_BATT_MS
+        now_ms = ticks_ms()
+        if self._last_replace_shown_ticks is None or ticks_diff(now_ms, self._last_replace_shown_ticks) > _REPLACE_BATT_MS:
+            if self._replace_batt_fb is None:
+                self._replace_batt_fb = self.display.compose_logo_text("REPLACE  ML2032  BATT.", x=10, y=-1)
+            self.display.show_precomposed(self._replace_batt_fb, show_time_ms=_REPLACE_BATT_MS)
+            self._last_replace_shown_ticks = ticks_ms()
+        return ret
     
     
     
     
-    def _check_aging_factor(self):
+    async def _check_aging_factor(self):
         """
         Check the aging factor at DS3231SN and the one stored at ESP32 NVS.
         In case an aging factor is zero at at DS3231SN, and ESP32 NVS holds a different value,
@@ -1096,49 +1273,50 @@ class SelfLearningClock:
         the aging factor at DS3231SN is not retained in case of power loss (battery died).
         """
         
+        # local copy of the debug setting
+        debug = config.DEBUG
+        
         aging = None
         
         # read aging factor from DS3232SN
         aging_factor_ds3231sn = await self.time_mgr.read_DS3231_aging()
-        if config.DEBUG and aging_factor_ds3231sn is not None:
+        if debug and aging_factor_ds3231sn is not None:
             print(f"[DEBUG]    Aging factor at DS3231SN flash memory: {aging_factor_ds3231sn}")
         
         # load aging factor from NVS
         aging_factor_nvs = self.get_aging_nvs()
-        if config.DEBUG:
+        if debug:
             if aging_factor_nvs is not None:
                 print(f"[DEBUG]    Aging factor at NVS memory: {aging_factor_nvs}")
             else:
                 print("[DEBUG]    Aging factor at NVS memory is None")
         
         # case the esp32.nsv is still None while the DS3231 aging is 0 or different value
-        if aging_factor_nvs is None and aging_factor_ds3231sn is not None:
-            ret = self.save_aging_nvs(int(aging_factor_ds3231sn), key=1)
-        
-        # case aging_factor_ds3231sn is zero and aging_factor_nvs differs from zero
-        if aging_factor_nvs is not None and aging_factor_ds3231sn is not None:
-            if aging_factor_ds3231sn == 0 and aging_factor_nvs != 0 :
-                # the value at ESP32 NVS get written to the DS3231SN memory
-                ret = await self.time_mgr.write_DS3231_aging(value = aging_factor_nvs)
-                if config.DEBUG:
-                    if ret:
-                        print(f"[DEBUG]    Aging factor at ESP32 NVS {aging_factor_ds3231sn} is now written at DS3231SN flash memory") 
-                    else:
-                        print(f"[DEBUG]    Error in writing the aging factor {aging_factor_ds3231sn} to DS3231SN flash memory")
-        
-        # case aging_factor_ds3231sn differs from zero and aging_factor_nvs in None
-        # this is the case when the aging_factor_ds3231sn is manually written in development phase
-        # this IF case must remain at the end of the other IF cases
-        if aging_factor_ds3231sn is not None and aging_factor_nvs is None:
-            ret = self.save_aging_nvs(aging_factor_ds3231sn)
-            if config.DEBUG:
+        # (i.e. when the aging_factor_ds3231sn is manually written in development phase)
+        if aging_factor_nvs is None:
+            if aging_factor_ds3231sn is None:
+                return None
+            
+            ret = self.save_aging_nvs(int(aging_factor_ds3231sn))
+            if debug:
                 if ret:
                     print(f"[DEBUG]    Aging factor at DS3231SN flash memory ({aging_factor_ds3231sn}) is now written to ESP32 NVS") 
                 else:
                     print(f"[DEBUG]    Error in writing the aging factor {aging_factor_ds3231sn} to ESP32 NVS")
+            
+            # aging factor from NVS, as just updated (cached value, NVS not accessed when saved)
+            return self.get_aging_nvs()
+        
+        # case aging_factor_ds3231sn is zero and aging_factor_nvs differs from zero
+        elif aging_factor_ds3231sn == 0 and aging_factor_nvs != 0:
+            # the value at ESP32 NVS get written to the DS3231SN memory
+            ret = await self.time_mgr.write_DS3231_aging(value = aging_factor_nvs)
+            if debug:
+                if ret:
+                    print(f"[DEBUG]    Aging factor at ESP32 NVS {aging_factor_nvs} is now written at DS3231SN flash memory") 
+                else:
+                    print(f"[DEBUG]    Error in writing the aging factor {aging_factor_nvs} to DS3231SN flash memory")
         
-        # load aging factor from NVS, eventually updated
-        aging_factor_nvs = self.get_aging_nvs()
         return aging_factor_nvs
     
     
@@ -1146,7 +1324,8 @@ class SelfLearningClock:
     
     def _convert_to_number(self, num_text):
         """Convert text to number"""
-        if isinstance(num_text, (int, float)):
+        t = type(num_text)
+        if t is int or t is float:
             return num_text
         
         try:
@@ -1158,28 +1337,8 @@ class SelfLearningClock:
     
     
     
-    def _c_to_f(self, temp_c):
-        """Function to convert Celsius to Fahrenheit"""
-        return temp_c * config.C_TO_F_COEFF + 32
-    
-    
-    
-    
-    def _make_folder(self, folder):
-        """Create folder if it doesn't exist."""
-        from os import mkdir
-        try:
-            mkdir(folder)
-        except OSError:
-            pass        # if folder already exists, ignore
-        del mkdir
-    
-    
-    
-    
     def _file_exists(self, path):
         """Checks if the file (path) exists."""
-        from os import stat
         try:
             stat(path)
             return True
@@ -1193,7 +1352,11 @@ class SelfLearningClock:
 async def main(logo_time_ms=0):
     """Main entry point"""
     clock = SelfLearningClock(logo_time_ms=logo_time_ms)
-    await clock.run()
+    try:
+        await clock.run()
+    finally:
+        # the buffered WDT warnings are written to file
+        clock.wdt_manager.shutdown()
 
 
 
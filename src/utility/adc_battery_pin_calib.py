@@ -31,55 +31,125 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from utime import time, gmtime, sleep_ms, ticks_ms, ticks_diff
+from utime import time, gmtime, sleep_ms, ticks_ms, ticks_diff, ticks_add
 from machine import Pin, ADC
-import gc
+from array import array
+from micropython import const
+import gc, micropython, sys
 
 from lib.lib_display import helvetica110b_digits, helvetica28b_subset
 from lib.lib_display.epd4in2_V2 import EPD
 from lib.lib_display.writer import Writer
 
-EPD_WIDTH = 400
-EPD_HEIGHT = 300
+EPD_WIDTH = const(400)
+EPD_HEIGHT = const(300)
+TEXT_HEIGHT = helvetica28b_subset.height()  # height (pixels) of the text lines plotted by show_data
+
+# corrdinates to organize the fields on the screen
+REF_X = const(110)
+REF_Y = const(90)
+Y_SHIFT = const(30)
 
 # settings for battery voltage check
 ADC_IN = Pin(4)                     # GPIO1 reads battery voltage
 adc_bat = ADC(ADC_IN)               # adc object
 adc_bat.atten(ADC.ATTN_11DB)        # 11dB attenuation (input range up to ~3.3V)
 V_REF = 3.3                         # ADC reference voltage (assuming ESP32 powered at 3.3V)
-DIVIDER_RATIO = 2                   # voltage divider ratio:  (R2 + R41) / R41 = (100 + 100) / 100
-VBAT_READINGS = 20                  # number of readings for averaging
-BATTERY_CHECK_INTERVAL_S = 1        # period (in secs) in between battery level check
+DIVIDER_RATIO = const(2)            # voltage divider ratio:  (R2 + R41) / R41 = (100 + 100) / 100
+VBAT_READINGS = const(20)           # number of readings for averaging
+VBAT_READ_PERIOD_MS = const(10)     # period (in ms) in between the readings
+VBAT_AVG_SAMPLES = const(10)        # number of battery voltage measurements in the moving average
+BATTERY_CHECK_INTERVAL_S = const(1) # period (in secs) in between battery level check
 
 # constants for the ADC calibration
 CORRECTION = 1.0    # default 1.0   # correction of adc reading slope vs measured (multimeter)
 SHIFT = 0.0         # default 0.0   # correction of adc reading shift vs measured (multimeter)    
 
+# slope from the sum of the raw ADC readings to the battery voltage (averaging included)
+ADC_SUM_TO_V = CORRECTION * V_REF * DIVIDER_RATIO / (65535 * VBAT_READINGS)
+
 # Constant to prevent battery level jumping up and down between levels
 HYSTERESIS_V = 0.03                 # 30 mV hysteresys from battery_level change
 
-# battery voltage initial variabile
-battery_voltage_list = []           # initialize list holdist the last voltage measurements
-battery_voltage = 0                 # initialize variable holding the battery voltage
-battery_level = 0                   # initialize variable holding the battery level
-last_battery_level = None           # track the last battery_level
-last_battery_check_time = 0         # initialize variable holding the last battery check time
+# tuples with the volatge thresholds and battery levels
+VOLTAGE_LEVELS = (4.1, 3.93, 3.82, 3.75, 3.7, 3.65, 3.6)
+PERCENT_LEVELS = (100, 80,   60,   40,   20,  10,   0)
+
+# index of each battery level in PERCENT_LEVELS
+LEVEL_INDEX = {level: i for i, level in enumerate(PERCENT_LEVELS)}
+
+# lookup table of the closest battery level, in 10 mV steps from the lowest to the highest voltage level
+LUT_MIN_V = VOLTAGE_LEVELS[-1]
+LUT_MAX_IDX = round((VOLTAGE_LEVELS[0] - LUT_MIN_V) * 100)
+PCT_LUT = bytearray(PERCENT_LEVELS[min(range(len(VOLTAGE_LEVELS)), key=lambda i: abs(LUT_MIN_V + idx / 100 - VOLTAGE_LEVELS[i]))]
+                    for idx in range(LUT_MAX_IDX + 1))
+
+# hysteresis thresholds to move up or down from each battery level (indexed as PERCENT_LEVELS)
+UP_THRESH_V = tuple(VOLTAGE_LEVELS[max(i - 1, 0)] + HYSTERESIS_V for i in range(len(VOLTAGE_LEVELS)))
+DOWN_THRESH_V = tuple(VOLTAGE_LEVELS[min(i + 1, len(VOLTAGE_LEVELS) - 1)] - HYSTERESIS_V for i in range(len(VOLTAGE_LEVELS)))
+
+
+class BatteryState():
+    """Battery measurement state, updated in place by check_battery"""
+    def __init__(self):
+        self.buf = array('d', [0.0] * VBAT_AVG_SAMPLES)  # circular buffer of the last voltage measurements
+        self.buf_idx = 0                # index of the circular buffer slot to write next
+        self.buf_count = 0              # number of measurements in the circular buffer
+        self.buf_sum = 0.0              # running sum of the measurements in the circular buffer
+        self.voltage = 0                # battery voltage (moving average)
+        self.level = None               # battery level, None until the first measurement
+        self.last_check_time = 0        # time of the last battery check
+
+
+# text of the fields last plotted by show_data, to skip plotting unchanged fields
+last_volt_str = None                # last plotted voltage text
+last_level_str = None               # last plotted battery level text
+
+# usage instructions, printed at the start with a single write
+INFO_BANNER = """
+#######################################################################################
+#                                                                                     #
+#  Shows the averaged voltage supplied at GPIO pin for the battery (and level %).     #
+#                                                                                     #
+#  Recall to detach the battery first !                                               #
+#                                                                                     #
+#  Connect an adjustable power supply voltage to the wiring, normally used by the     #
+#  battery to energize the T8 board.                                                  #
+#                                                                                     #
+#  Vary the power supply voltage from ca 3.2 Volts to max 4.2 Volts.                  #
+#  After every variation, wait until the value on the screen gets stable (averaging)  #
+#  Make a table with the supply voltage, and the voltage measured by the ESP32.       #
+#                                                                                     #
+#  Calculate the correction factor for the slope and the one for the shift:           #
+#  The correction of adc reading vs measured (multimeter / power supply voltage)      #
+#  - for the slope should be > 1 when intepreted value is smaller than real.          #
+#  - for the shift should be > 0 when intepreted value is smaller than real.          #
+#                                                                                     #
+#  Adjust the battery_manager.py accordingly:                                         #
+#  - constant CORRECTION  (default = 1.0 --> Adapt it according to your case)         #
+#  - constant SHIFT       (default = 0.0 --> Adapt it according to your case)         #
+#                                                                                     #
+#######################################################################################
+"""
 
 
+@micropython.native
 def read_battery_voltage(adc_avg=0, bat_voltage=0):
     """Monitor the battery voltage"""
     try:
-        adc_avg = adc_bat.read()       # first ADC reading
-        sleep_ms(5)                    # Short sleep time
+        read = adc_bat.read_u16        # local reference to the ADC read method
+        adc_sum = 0
+        deadline = ticks_ms()          # time reference of the readings
 
         for _ in range(VBAT_READINGS): # iterating VBAT_READINGS times
-            adc_avg += adc_bat.read()  # adds raw ADC value (0-4095) for VBAT_READINGS times
-            sleep_ms(10)               # short sleep time
-        
-        adc_avg /= (VBAT_READINGS + 1) # average the VBAT_READINGS readings
+            adc_sum += read()          # adds ADC value (0-65535) for VBAT_READINGS times, as integer
+            
+            # sleeps until the next reading is due, so the readings are VBAT_READ_PERIOD_MS apart
+            deadline = ticks_add(deadline, VBAT_READ_PERIOD_MS)
+            sleep_ms(max(0, ticks_diff(deadline, ticks_ms())))
         
-         # convertion to batt voltage and correction
-        bat_voltage = SHIFT + CORRECTION * (adc_avg / 4095) * V_REF * DIVIDER_RATIO
+        # averaging, convertion to batt voltage and correction, in a single float operation
+        bat_voltage = SHIFT + ADC_SUM_TO_V * adc_sum
         return bat_voltage             # returns the measured battery voltag
 
     except Exception as e:
@@ -88,168 +158,163 @@ def read_battery_voltage(adc_avg=0, bat_voltage=0):
 
 
 
-def get_battery_percentage(voltage):
+@micropython.native
+def get_battery_percentage(voltage, last_level=None):
     """
     Returns the battery percentage corresponding to the closest voltage level.
     Args:
         voltage (float): The measured battery voltage.
+        last_level (int|None): The last battery percentage (None for first call).
     Returns:
         int: The battery percentage that best matches the voltage.
     """
-    voltage_levels = [4.1, 3.93, 3.82, 3.75, 3.7, 3.65, 3.6]
-    percent_levels = [100, 80,   60,   40,   20,  10,   0]
-
-    # find the index of the voltage level closest to the measured voltage
-    closest_index = min(range(len(voltage_levels)), key=lambda i: abs(voltage - voltage_levels[i]))
-    new_level = percent_levels[closest_index]
+    # battery level closest to the measured voltage, from the lookup table (voltage clamped to the table range)
+    new_level = PCT_LUT[max(0, min(LUT_MAX_IDX, round((voltage - LUT_MIN_V) * 100)))]
     
-    # if this is the first measurement, return directly
-    if last_battery_level is None:
+    # if this is the first measurement, or the level is unchanged, return directly
+    if last_level is None or new_level == last_level:
         return new_level
 
     # find index of the last level
-    try:
-        last_index = percent_levels.index(last_level)
-    except ValueError:
-        last_index = closest_index
+    last_index = LEVEL_INDEX.get(last_level, LEVEL_INDEX[new_level])
 
     # hysteresis logic
     if new_level > last_level:
         # only go up if voltage exceeds next threshold + hysteresis
-        next_up_v = voltage_levels[last_index - 1] if last_index > 0 else voltage_levels[0]
-        if voltage >= next_up_v + HYSTERESIS_V:
+        if voltage >= UP_THRESH_V[last_index]:
             return new_level
         else:
             return last_level
 
-    elif new_level < last_level:
+    else:  # new_level < last_level
         # only go down if voltage goes below next threshold - hysteresis
-        next_down_v = voltage_levels[last_index + 1] if last_index < len(voltage_levels) - 1 else voltage_levels[-1]
-        if voltage <= next_down_v - HYSTERESIS_V:
+        if voltage <= DOWN_THRESH_V[last_index]:
             return new_level
         else:
             return last_level
 
-    else:
-        return last_level
-
 
 
-def check_battery(now, battery_voltage, battery_voltage_list, battery_level, last_battery_check_time,
-                  BATTERY_CHECK_INTERVAL_S, first_time = False):
+def check_battery(state, now, first_time = False):
+    """Measures the battery voltage and level (every BATTERY_CHECK_INTERVAL_S), updating state in place"""
 
-    if first_time or now > last_battery_check_time + BATTERY_CHECK_INTERVAL_S:
+    if first_time or now > state.last_check_time + BATTERY_CHECK_INTERVAL_S:
         battery_voltage = round(read_battery_voltage(),3) # battery voltage is measured   
-        battery_voltage_list.append(battery_voltage)
         
-        if len(battery_voltage_list) > 1:
-            battery_voltage = sum(battery_voltage_list) / len(battery_voltage_list)
+        # the measurement replaces the oldest one in the circular buffer, the running sum is updated
+        buf_idx = state.buf_idx
+        if state.buf_count < VBAT_AVG_SAMPLES:
+            state.buf_count += 1
+        else:
+            state.buf_sum -= state.buf[buf_idx]
+        state.buf_sum += battery_voltage
+        state.buf[buf_idx] = battery_voltage
+        state.buf_idx = (buf_idx + 1) % VBAT_AVG_SAMPLES
         
-        if len(battery_voltage_list) > 10:
-            battery_voltage_list.pop(0)
+        # moving average of the battery voltage
+        state.voltage = state.buf_sum / state.buf_count
             
-        battery_level = get_battery_percentage(battery_voltage)
-        last_battery_level = battery_level
+        state.level = get_battery_percentage(state.voltage, state.level)
         
-        last_battery_check_time = time()
-    
-    return battery_voltage, battery_voltage_list, battery_level, last_battery_check_time
+        state.last_check_time = time()
 
 
-def show_data(volt, batt_level, run, partial=True):
-    
-    # corrdinates to organize the fields on the screen
-    ref_x = 110
-    ref_y = 90
-    y_shift = 30
-    
-    # add a white rect to erase old day text
-    epd.fill_rect(0, 0, 399, 299, 1)                 
-    
-    # measurement counter
+def volt_text(volt):
+    """Voltage text with 3 decimals, formatted via integer millivolts"""
+    mv = int(volt * 1000 + 0.5)
+    return f"{mv // 1000}.{mv % 1000:03d}"
+
+
+def draw_measure(run):
+    """Plots the measurement counter (white rect erasing the old text)"""
+    epd.fill_rect(10, 270, EPD_WIDTH - 10, EPD_HEIGHT - 270, 1)
     Writer.set_textpos(epd, 270, 10)
     wri_28.printstring(f"MEASURE: {run}", invert=True)
-    
-    # measured voltage at GPIO input pin
-    Writer.set_textpos(epd, ref_y, ref_x)
-    wri_28.printstring(f"{round(volt,3):.3f} VOLT", invert=True)
-    
-    # interpreted battery level
-    Writer.set_textpos(epd, ref_y + 2*y_shift, ref_x)
-    wri_28.printstring(f"{batt_level} %", invert=True)
 
-    # intermittent line separation to substantiate
+
+def draw_volt(volt):
+    """Plots the measured voltage at GPIO input pin, only when changed"""
+    global last_volt_str
+    volt_str = volt_text(volt) + " VOLT"
+    if volt_str == last_volt_str:
+        return
+    epd.fill_rect(REF_X, REF_Y, EPD_WIDTH - REF_X, TEXT_HEIGHT, 1)
+    Writer.set_textpos(epd, REF_Y, REF_X)
+    wri_28.printstring(volt_str, invert=True)
+    last_volt_str = volt_str
+
+
+def draw_level(batt_level):
+    """Plots the interpreted battery level, only when changed"""
+    global last_level_str
+    level_str = f"{batt_level} %"
+    if level_str == last_level_str:
+        return
+    epd.fill_rect(REF_X, REF_Y + 2*Y_SHIFT, EPD_WIDTH - REF_X, TEXT_HEIGHT, 1)
+    Writer.set_textpos(epd, REF_Y + 2*Y_SHIFT, REF_X)
+    wri_28.printstring(level_str, invert=True)
+    last_level_str = level_str
+
+
+def draw_sep(run):
+    """Plots the intermittent separation line at the even runs, and erases it at the odd ones"""
     if run % 2 == 0:
-        Writer.set_textpos(epd, ref_y+y_shift, ref_x)
+        Writer.set_textpos(epd, REF_Y + Y_SHIFT, REF_X)
         wri_28.printstring("----------------", invert=True)
+    else:
+        epd.fill_rect(REF_X, REF_Y + Y_SHIFT, EPD_WIDTH - REF_X, TEXT_HEIGHT, 1)
+
+
+def show_data(volt, batt_level, run, partial=True):
+    draw_measure(run)
+    draw_volt(volt)
+    draw_level(batt_level)
+    draw_sep(run)
 
 
 def print_info():
-    print()
-    print("#" *87)
-    print("#                                                                                     #")
-    print("#  Shows the averaged voltage supplied at GPIO pin for the battery (and level %).     #")
-    print("#                                                                                     #")
-    print("#  Recall to detach the battery first !                                               #")
-    print("#                                                                                     #")
-    print("#  Connect an adjustable power supply voltage to the wiring, normally used by the     #")
-    print("#  battery to energize the T8 board.                                                  #")
-    print("#                                                                                     #")
-    print("#  Vary the power supply voltage from ca 3.2 Volts to max 4.2 Volts.                  #")
-    print("#  After every variation, wait until the value on the screen gets stable (averaging)  #")
-    print("#  Make a table with the supply voltage, and the voltage measured by the ESP32.       #")
-    print("#                                                                                     #")
-    print("#  Calculate the correction factor for the slope and the one for the shift:           #")
-    print("#  The correction of adc reading vs measured (multimeter / power supply voltage)      #")
-    print("#  - for the slope should be > 1 when intepreted value is smaller than real.          #")
-    print("#  - for the shift should be > 0 when intepreted value is smaller than real.          #")
-    print("#                                                                                     #")
-    print("#  Adjust the battery_manager.py accordingly:                                         #")
-    print("#  - constant CORRECTION  (default = 1.0 --> Adapt it according to your case)         #")
-    print("#  - constant SHIFT       (default = 0.0 --> Adapt it according to your case)         #")
-    print("#                                                                                     #")
-    print("#" *87)
-    print()
+    print(INFO_BANNER)
     
     
     
 print_info()
 epd = EPD()
 epd.init()
-gc.collect()
 wri_110 = Writer(epd, helvetica110b_digits, verbose=False)
 wri_28 = Writer(epd, helvetica28b_subset, verbose=False)
+
+# single collection once initialized, then automatic collections each time a quarter of the free heap is allocated
 gc.collect()
-epd.reset()   # wake the epd up from deep sleep
+gc.threshold(gc.mem_free() // 4 + gc.mem_alloc())
 
 
 full_refresh_cycles = 60
 update_epd = False
 run = 0
+batt = BatteryState()
+last_printed = None       # (voltage text, battery level) of the last console line
 while True:
     
-    epd.reset()   # wake the epd up from deep sleep
+    epd.reset()   # wake the epd up from deep sleep (epd.sleep() at the loop end requires the hardware reset)
     
     if run >= full_refresh_cycles:
-        epd.reset()
         epd.display()
         run = 0
     
     now = time()
     
     # first check of the battery voltage and related level 
-    battery_voltage, battery_voltage_list, battery_level, last_battery_check_time = check_battery(now,
-                                                                                                  battery_voltage,
-                                                                                                  battery_voltage_list,
-                                                                                                  battery_level,
-                                                                                                  last_battery_check_time,
-                                                                                                  BATTERY_CHECK_INTERVAL_S)
+    check_battery(batt, now)
     
-    show_data(battery_voltage, battery_level, run, partial=True)
+    show_data(batt.voltage, batt.level, run, partial=True)
     epd.partialDisplay()
     epd.sleep()               # prevents display damages on the long run (command takes ca 100ms)
     run += 1
     
-    print(f"Avg batt = {battery_voltage:.3f}V \t Batt level = {battery_level}% \t Raw data = {battery_voltage_list}",  end='\r')
+    # the console line is written only when the average voltage (mV) or the battery level changes
+    volt_str = volt_text(batt.voltage)
+    if (volt_str, batt.level) != last_printed:
+        sys.stdout.write(f"Avg batt = {volt_str}V \t Batt level = {batt.level}% \t Raw data = {list(batt.buf[:batt.buf_count])}\r")
+        last_printed = (volt_str, batt.level)
     
     sleep_ms(1000)
@@ -17,14 +17,16 @@ Every unit affects about 1 ppm.
 
 """
 
-SDA_PIN = 1
-SCL_PIN = 2
-DS3231_PWR_PIN = 3
+from micropython import const
+
+SDA_PIN = const(1)
+SCL_PIN = const(2)
+DS3231_PWR_PIN = const(3)
 
 
 # modules for the DS3231SN - AT24C32 board
 from ds3231_driver import DS3231
-from machine import SoftI2C, Pin
+from machine import I2C, Pin
 from utime import sleep_ms
 
 
@@ -47,7 +49,7 @@ ds3231_pwr.value(1)
 sleep_ms(100)
 
 # initialize the i2c
-i2c = SoftI2C(scl=Pin(SCL_PIN), sda=Pin(SDA_PIN), freq=400_000)
+i2c = I2C(0, scl=Pin(SCL_PIN), sda=Pin(SDA_PIN), freq=400_000)
 sleep_ms(250)
         
 # instance of RTC module with EEPROM support
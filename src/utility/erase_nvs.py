@@ -35,8 +35,14 @@ SOFTWARE.
 
 from esp32 import NVS
 
-def clear_nvs(namespace=None):
-    """Erase all keys in a specific NVS namespace (e.g., 'storage')"""
+# keys tried for erasing (numbers 1–10 for example), since NVS doesn't provide key enumeration in MicroPython
+_NVS_KEYS = tuple(str(key_id) for key_id in range(1, 11))
+
+# ESP_ERR_NVS_NOT_FOUND, the error code when there is no such key
+_NVS_NOT_FOUND = -4354
+
+def clear_nvs(namespace=None, verbose=False):
+    """Erase all keys in a specific NVS namespace (e.g., 'storage'), per key info printed when verbose"""
     
     if namespace is None:
         print("\n[DEBUG]   Necessary to specify a NVS namespace\n")
@@ -45,22 +51,24 @@ def clear_nvs(namespace=None):
         try:
             nvs = NVS(namespace)
 
-            # try to remove all stored keys (numbers 1–10 for example)
-            # since NVS doesn't provide key enumeration in MicroPython.
-            for key_id in range(1, 11):
-                key = str(key_id)
+            # try to remove all stored keys
+            erased = 0
+            for key in _NVS_KEYS:
                 try:
                     nvs.erase_key(key)
-                    print(f"[INFO]    Key '{key}' erased from NVS")
+                    erased += 1
+                    if verbose:
+                        print(f"[INFO]    Key '{key}' erased from NVS")
                 except OSError as e:
-                    # -4354 (ESP_ERR_NVS_NOT_FOUND) means no such key
-                    if getattr(e, "errno", None) == -4354:
-                        print(f"[DEBUG]   Key '{key}' not found, skipping")
+                    # case no such key
+                    if e.args and e.args[0] == _NVS_NOT_FOUND:
+                        if verbose:
+                            print(f"[DEBUG]   Key '{key}' not found, skipping")
                     else:
                         print(f"[ERROR]   Issue erasing key '{key}': {e}")
 
             nvs.commit()
-            print("[INFO]    NVS cleanup completed successfully")
+            print(f"[INFO]    NVS cleanup completed successfully, {erased} key(s) erased")
 
         except Exception as e:
             print(f"[ERROR]   Cannot open NVS namespace '{namespace}': {e}")